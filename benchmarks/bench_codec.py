@@ -0,0 +1,93 @@
+"""Compares load/save time and file size of the user data encodings.
+
+Run from the repository root:
+
+    python benchmarks/bench_codec.py
+    python benchmarks/bench_codec.py --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import codec
+
+ITEMS = ["fishing rod", "salmon", "tuna", "cod", "old boot", "medkit", "energy drink", "rare gem", "diamond"]
+
+
+def make_users(count):
+    rng = random.Random(count)
+    users = {}
+    for i in range(count):
+        users[str(10**17 + i)] = {
+            "wallet": rng.randrange(0, 100000),
+            "bank": rng.randrange(0, 1000000),
+            "level": rng.randrange(1, 60),
+            "xp": rng.randrange(0, 5000),
+            "inventory": {item: rng.randrange(1, 40) for item in rng.sample(ITEMS, rng.randrange(0, len(ITEMS)))},
+            "daily_streak": rng.randrange(0, 30),
+            "last_daily": None,
+            "pet": rng.choice([None, "Dog", "Cat"]),
+            "job": rng.choice([None, "Programmer", "Chef"]),
+        }
+    return users
+
+
+def stdlib_indent_save(path, users):
+    with open(path, 'w') as f:
+        json.dump(users, f, indent=4)
+
+
+def stdlib_indent_load(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def codec_save(path, users):
+    with open(path, 'wb') as f:
+        f.write(codec.dumps(users))
+
+
+def archive_save(path, users):
+    codec.dump_archive(path, users)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    encoder = "orjson" if codec.orjson is not None else "json"
+    formats = [
+        ("json indent=4 (old)", ".json", stdlib_indent_save, stdlib_indent_load),
+        (f"{encoder} compact", ".json", codec_save, codec.read),
+        (f"archive {codec.archive_extension()}", codec.archive_extension(), archive_save, codec.load_archive),
+    ]
+
+    print(f"{'users':>9}  {'format':<28} {'save (s)':>9} {'load (s)':>9} {'size (MB)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            users = make_users(size)
+            for name, extension, save, load in formats:
+                path = os.path.join(directory, "users" + extension)
+                save_time, _ = timed(save, path, users)
+                load_time, loaded = timed(load, path)
+                assert len(loaded) == size
+                megabytes = os.path.getsize(path) / 1024 / 1024
+                print(f"{size:>9}  {name:<28} {save_time:>9.3f} {load_time:>9.3f} {megabytes:>10.2f}")
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
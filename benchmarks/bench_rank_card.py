@@ -0,0 +1,129 @@
+"""Compares per-card render time of the old rank card code and the template-based one.
+
+Run from the repository root (needs Pillow):
+
+    python benchmarks/bench_rank_card.py
+    python benchmarks/bench_rank_card.py --cards 500
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
+
+from utils.rank_card import AVATAR_POS, AVATAR_SIZE, HEIGHT, WIDTH, get_template, render_rank_card
+
+
+def make_avatar(size=256):
+    avatar = Image.new("RGB", (size, size))
+    draw = ImageDraw.Draw(avatar)
+    for y in range(size):
+        draw.line((0, y, size, y), fill=(y % 256, (2 * y) % 256, 180))
+    with io.BytesIO() as out:
+        avatar.save(out, "PNG")
+        return out.getvalue()
+
+
+def render_old(avatar_bytes, name, level, xp, xp_needed):
+    """The renderer as it was before the template: fonts, overlay and mask rebuilt every card."""
+    # Fonts - Attempt to use a common font, fallback to default
+    try:
+        font_medium = ImageFont.truetype("arial.ttf", 50)
+        font_small = ImageFont.truetype("arial.ttf", 40)
+        font_level = ImageFont.truetype("arial.ttf", 80)
+        font_watermark = ImageFont.truetype("arial.ttf", 20)
+    except IOError:
+        font_medium = ImageFont.load_default()
+        font_small = ImageFont.load_default()
+        font_level = ImageFont.load_default()
+        font_watermark = ImageFont.load_default()
+
+    avatar = Image.open(io.BytesIO(avatar_bytes)).convert("RGBA") if avatar_bytes else None
+
+    # Blurred avatar as the background
+    if avatar is not None:
+        card = avatar.resize((WIDTH, HEIGHT)).filter(ImageFilter.GaussianBlur(5))
+    else:
+        card = Image.new("RGB", (WIDTH, HEIGHT), "#2C2F33")
+
+    draw = ImageDraw.Draw(card)
+
+    # Overlay to darken the background for better text readability
+    overlay = Image.new('RGBA', card.size, (0, 0, 0, 150))
+    card.paste(overlay, (0, 0), overlay)
+
+    # Round avatar
+    if avatar is not None:
+        mask = Image.new('L', (AVATAR_SIZE, AVATAR_SIZE), 0)
+        ImageDraw.Draw(mask).ellipse((0, 0, AVATAR_SIZE, AVATAR_SIZE), fill=255)
+        output = ImageOps.fit(avatar, (AVATAR_SIZE, AVATAR_SIZE), centering=(0.5, 0.5))
+        output.putalpha(mask)
+        card.paste(output, AVATAR_POS, output)
+        x, y = AVATAR_POS
+        draw.ellipse((x - 5, y - 5, x + AVATAR_SIZE + 5, y + AVATAR_SIZE + 5), outline="#7289DA", width=5)
+
+    # Draw progress bar background
+    progress_bar_x = 240
+    progress_bar_y = 170
+    progress_bar_width = 610
+    progress_bar_height = 40
+    draw.rounded_rectangle((progress_bar_x, progress_bar_y, progress_bar_x + progress_bar_width, progress_bar_y + progress_bar_height),
+                           radius=20, fill="#484b4e")
+
+    # Draw progress bar
+    if xp_needed > 0:
+        progress = (xp / xp_needed) * progress_bar_width
+        draw.rounded_rectangle((progress_bar_x, progress_bar_y, progress_bar_x + progress, progress_bar_y + progress_bar_height),
+                               radius=20, fill="#57F287")
+
+    # Draw text
+    draw.text((240, 50), name, fill="#FFFFFF", font=font_medium)
+
+    xp_text = f"{xp} / {xp_needed} XP"
+    xp_text_width = draw.textlength(xp_text, font=font_small)
+    draw.text((840 - xp_text_width, 120), xp_text, fill="#BBBBBB", font=font_small)
+
+    draw.text((240, 110), "LEVEL", fill="#AAAAAA", font=font_small)
+
+    level_number_text = f"{level}"
+    level_number_width = draw.textlength(level_number_text, font=font_level)
+    draw.text((840 - level_number_width, 45), level_number_text, fill="#FEE75C", font=font_level)
+
+    # Watermark
+    watermark_text = ".gg/code-verse"
+    watermark_width = draw.textlength(watermark_text, font=font_watermark)
+    draw.text((WIDTH - watermark_width - 20, HEIGHT - 40), watermark_text, fill="#FFFFFF", font=font_watermark)
+
+    with io.BytesIO() as image_binary:
+        card.save(image_binary, 'PNG')
+        return image_binary.getvalue()
+
+
+def bench(render, cards, avatar):
+    start = time.perf_counter()
+    for i in range(cards):
+        render(avatar, "Benchmark User", 12, i % 900, 1420)
+    return (time.perf_counter() - start) / cards * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=200)
+    args = parser.parse_args()
+
+    avatar = make_avatar()
+    get_template() # built once per worker process, so keep it out of the timing
+
+    print(f"{'renderer':<22} {'avatar':>8} {'no avatar':>10}  (ms / card)")
+    for name, render in (("old", render_old), ("template", render_rank_card)):
+        with_avatar = bench(render, args.cards, avatar)
+        without = bench(render, args.cards, None)
+        print(f"{name:<22} {with_avatar:>8.2f} {without:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
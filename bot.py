@@ -7,6 +7,20 @@ import logging
 import sys
 import traceback
 import datetime
+import aiohttp
+from utils.store import UserStore
+from utils.backends import JsonBackend, ShardedJsonBackend, SqliteBackend
+from utils.journal import Journal
+from utils.prefixes import PrefixResolver
+from utils.blacklist import Blacklist
+from utils.tos import TosIndex, TosNotAccepted
+from utils.gates import GatePipeline
+from utils.xp_ledger import XpLedger
+from utils import xp_curve
+from utils.rank_card import RankCardRenderer
+from utils.avatars import AvatarCache
+from utils.card_cache import CardCache
+from utils.snapshot import snapshots
 
 logging.basicConfig(level=logging.INFO, handlers=[
     logging.FileHandler("discord.log", encoding="utf-8", mode="w"),
@@ -16,42 +30,9 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-def get_prefix(bot, message):
+async def get_prefix(bot, message):
     """A callable to retrieve prefixes for guilds."""
-    import datetime
-    try:
-        with open("data/np_users.json", "r") as f:
-            np_users = json.load(f)
-        user_id = str(message.author.id)
-        if user_id in np_users:
-            user_data = np_users[user_id]
-            if not user_data.get("active", False):
-                return "cx "
-            expires_at = user_data.get("expires_at", "lifetime")
-            if expires_at != "lifetime":
-                try:
-                    expiry = datetime.datetime.fromisoformat(expires_at)
-                    if expiry < datetime.datetime.now():
-                        user_data["active"] = False
-                        with open("data/np_users.json", "w") as f:
-                            json.dump(np_users, f, indent=4)
-                        return "cx "
-                except (ValueError, TypeError):
-                    return "cx "
-            return ["", "cx "]
-    except (FileNotFoundError, json.JSONDecodeError):
-        if message.author.id == bot.owner_id:
-            return ["", "cx "]
-    
-    if not message.guild:
-        return "cx "
-
-    try:
-        with open("data/prefixes.json", "r") as f:
-            prefixes = json.load(f)
-        return prefixes.get(str(message.guild.id), "cx ")
-    except (FileNotFoundError, json.JSONDecodeError):
-        return "cx "
+    return bot.prefixes.resolve(message, bot.owner_id)
 
 bot = commands.Bot(
     command_prefix=get_prefix, 
@@ -61,26 +42,88 @@ bot = commands.Bot(
     help_command=None
 )
 
-@bot.check
+def load_config():
+    """Reads config.json, falling back to an empty config."""
+    try:
+        with open("config.json", "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def create_backend(config):
+    """Builds the user storage backend selected by `storage_backend` in config.json."""
+    backend = config.get("storage_backend", "json")
+    if backend == "sqlite":
+        return SqliteBackend(config.get("sqlite_path", "data/users.db"), migrate_from="data/users.json")
+    if backend == "sharded":
+        return ShardedJsonBackend(config.get("shard_dir", "data/users"), config.get("shard_count", 16), migrate_from="data/users.json")
+    return JsonBackend("data/users.json")
+
+def create_journal(config):
+    """Builds the change journal for the JSON backend, if enabled."""
+    # SQLite is already crash-safe through its own WAL, so the journal only backs the JSON files.
+    if config.get("journal", True) and config.get("storage_backend", "json") in ("json", "sharded"):
+        return Journal("data/users.journal")
+    return None
+
+config = load_config()
+snapshots.compact = config.get("compact_json", True)
+bot.store = UserStore(
+    create_backend(config),
+    flush_interval=config.get("store_flush_interval", 10),
+    flush_threshold=config.get("store_flush_threshold", 50),
+    journal=create_journal(config),
+    max_hot_users=config.get("store_max_hot_users", 0)
+)
+bot.prefixes = PrefixResolver()
+bot.blacklist = Blacklist()
+bot.tos = TosIndex(version=config.get("tos_version", 1))
+# Levels keep following the curve they were computed with until `admin recomputexp` moves everyone over
+bot.xp_curve = xp_curve.load_applied()
+if bot.xp_curve != xp_curve.XpCurve.from_config(config.get("xp_curve")):
+    print("The XP curve in config.json differs from the one levels were computed with; run `admin recomputexp` to apply it.")
+bot.xp = XpLedger(bot)
+bot.rank_cards = RankCardRenderer(config.get("rank_card_workers", 2), config.get("rank_card_queue", 32))
+bot.card_cache = CardCache(config.get("rank_card_cache_mb", 16) * 1024 * 1024, config.get("rank_card_xp_buckets", 50))
+
 async def globally_block_dms(ctx):
     return ctx.guild is not None 
 
-@bot.check
 async def check_if_blacklisted(ctx):
-    """Globally checks if a user is blacklisted."""
-    blacklist_file = "data/blacklist.json"
-    if not os.path.exists(blacklist_file):
-        return True 
-
-    with open(blacklist_file, 'r') as f:
-        blacklist = json.load(f)
-    
-    if ctx.author.id in blacklist:
+    """Globally checks if a user or server is blacklisted."""
+    if bot.blacklist.is_user_blocked(ctx.author.id):
         await ctx.send("You are banned from using this bot. Join the support server for help: https://discord.gg/code-verse")
         return False
+
+    if ctx.guild is not None and bot.blacklist.is_guild_blocked(ctx.guild.id):
+        await ctx.send("This server is banned from using this bot. Join the support server for help: https://discord.gg/code-verse")
+        return False
     
     return True
 
+# Every command passes through these gates, cheapest first. The ToS cog adds its own gate at the end.
+bot.gates = GatePipeline()
+bot.gates.add("dm", globally_block_dms)
+bot.gates.add("blacklist", check_if_blacklisted)
+bot.add_check(bot.gates.run)
+
+def could_be_command(message):
+    """Cheap pre-check so chat from no-prefix users skips command parsing."""
+    prefixes = bot.prefixes.resolve(message, bot.owner_id)
+    if "" not in prefixes:
+        return True
+    if any(prefix and message.content.startswith(prefix) for prefix in prefixes):
+        return True
+    # all_commands holds every name and alias and ignores case since the bot is case_insensitive.
+    first_word = message.content.split(None, 1)[0] if message.content else ""
+    return first_word in bot.all_commands
+
+@bot.event
+async def on_message(message):
+    if message.author.bot or not could_be_command(message):
+        return
+    await bot.process_commands(message)
+
 @bot.event
 async def on_command_error(ctx, error):
     if isinstance(error, commands.CommandOnCooldown):
@@ -101,6 +144,8 @@ async def on_command_error(ctx, error):
         await ctx.send(embed=em)
     elif isinstance(error, commands.CommandNotFound):
         pass 
+    elif isinstance(error, TosNotAccepted):
+        pass # The ToS prompt has already been sent
     else:
         print(f"Ignoring exception in command {ctx.command}:", file=sys.stderr)
         traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
@@ -114,9 +159,6 @@ async def on_ready():
     print(f'https://discord.gg/code-verse')
     if not os.path.exists('data'):
         os.makedirs('data')
-    if not os.path.isfile('data/users.json'):
-        with open('data/users.json', 'w') as f:
-            json.dump({}, f)
     await bot.change_presence(activity=discord.Game(name="cx help | Managing the Economy"))
 
 async def load_cogs():
@@ -141,8 +183,29 @@ async def main():
         return
 
     async with bot:
-        await load_cogs()
-        await bot.start(token)
+        # Fork the render workers before the store starts any threads
+        bot.rank_cards.start()
+        await bot.store.start()
+        # One pooled HTTP session for every cog
+        bot.session = aiohttp.ClientSession()
+        bot.avatars = AvatarCache(bot.session, max_disk_bytes=config.get("avatar_cache_disk_mb", 256) * 1024 * 1024)
+        await bot.avatars.prune()
+        bot.prefixes.load()
+        bot.prefixes.start()
+        bot.blacklist.load()
+        bot.tos.load()
+        bot.xp.start()
+        try:
+            await load_cogs()
+            await bot.start(token)
+        finally:
+            await bot.prefixes.close()
+            await bot.xp.close()
+            await bot.store.close()
+            bot.tos.close()
+            bot.rank_cards.close()
+            await bot.session.close()
+            await snapshots.drain()
 
 if __name__ == "__main__":
     try:
@@ -2,52 +2,16 @@ import discord
 from discord.ext import commands
 import json
 import os
+import copy
+import asyncio
+from datetime import datetime
+from utils import codec, schema, xp_curve
 
 class Admin(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.data_file = "data/users.json"
-        self.blacklist_file = "data/blacklist.json"
-        self.prefix_file = "data/prefixes.json"
-
-    async def get_prefixes(self):
-        """Reads the prefixes from the JSON file."""
-        if not os.path.exists(self.prefix_file):
-            with open(self.prefix_file, 'w') as f:
-                json.dump({}, f)
-            return {}
-        with open(self.prefix_file, 'r') as f:
-            return json.load(f)
-
-    async def save_prefixes(self, prefixes):
-        """Saves the prefixes to the JSON file."""
-        with open(self.prefix_file, 'w') as f:
-            json.dump(prefixes, f, indent=4)
-
-    async def get_blacklist(self):
-        """Reads the blacklist from the JSON file."""
-        if not os.path.exists(self.blacklist_file):
-            with open(self.blacklist_file, 'w') as f:
-                json.dump([], f)
-            return []
-        with open(self.blacklist_file, 'r') as f:
-            return json.load(f)
-
-    async def save_blacklist(self, blacklist):
-        """Saves the blacklist to the JSON file."""
-        with open(self.blacklist_file, 'w') as f:
-            json.dump(blacklist, f, indent=4)
-
-    async def get_bank_data(self):
-        """Reads user data from the JSON file."""
-        with open(self.data_file, 'r') as f:
-            users = json.load(f)
-        return users
-
-    async def save_bank_data(self, users):
-        """Saves user data to the JSON file."""
-        with open(self.data_file, 'w') as f:
-            json.dump(users, f, indent=4)
+        self.store = bot.store
+        self.blacklist = bot.blacklist
 
     @commands.group(hidden=True, invoke_without_command=True)
     @commands.is_owner()
@@ -59,40 +23,70 @@ class Admin(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def add_money(self, ctx, member: discord.Member, amount: int):
         """Adds a specified amount of money to a user's wallet."""
-        users = await self.get_bank_data()
-        user_id = str(member.id)
-        if user_id not in users:
-            await ctx.send("This user does not have an account.")
-            return
-        users[user_id]["wallet"] += amount
-        await self.save_bank_data(users)
-        await ctx.send(f"Added {amount} coins to {member.mention}'s wallet.")
+        async with self.store.transaction(member.id, op="admin_addmoney") as (account,):
+            if account is None:
+                reply = "This user does not have an account."
+            else:
+                account["wallet"] += amount
+                reply = f"Added {amount} coins to {member.mention}'s wallet."
+        await ctx.send(reply)
 
     @admin.command(name="removemoney")
     @commands.has_permissions(administrator=True)
     async def remove_money(self, ctx, member: discord.Member, amount: int):
         """Removes a specified amount of money from a user's wallet."""
-        users = await self.get_bank_data()
-        user_id = str(member.id)
-        if user_id not in users:
-            await ctx.send("This user does not have an account.")
-            return
-        users[user_id]["wallet"] -= amount
-        await self.save_bank_data(users)
-        await ctx.send(f"Removed {amount} coins from {member.mention}'s wallet.")
+        async with self.store.transaction(member.id, op="admin_removemoney") as (account,):
+            if account is None:
+                reply = "This user does not have an account."
+            else:
+                account["wallet"] -= amount
+                reply = f"Removed {amount} coins from {member.mention}'s wallet."
+        await ctx.send(reply)
 
     @admin.command(name="resetacc")
     @commands.has_permissions(administrator=True)
     async def reset_account(self, ctx, member: discord.Member):
         """Resets a user's account to the default state."""
-        users = await self.get_bank_data()
-        user_id = str(member.id)
-        if user_id not in users:
-            await ctx.send("This user does not have an account to reset.")
+        async with self.store.transaction(member.id, op="admin_resetacc") as (account,):
+            if account is None:
+                reply = "This user does not have an account to reset."
+            else:
+                account.clear()
+                account.update(schema.new_account())
+                reply = f"Reset {member.mention}'s account."
+        await ctx.send(reply)
+
+    @admin.command(name="recomputexp")
+    @commands.is_owner()
+    async def recompute_xp(self, ctx):
+        """Moves every user's level over to the XP curve in config.json, keeping their total XP."""
+        try:
+            with open('config.json', 'r') as f:
+                new_curve = xp_curve.XpCurve.from_config(json.load(f).get("xp_curve"))
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            await ctx.send(f"Couldn't read the XP curve from config.json: {e}")
             return
-        users[user_id] = {"wallet": 100, "bank": 0, "level": 1, "xp": 0, "inventory": [], "daily_streak": 0, "last_daily": None}
-        await self.save_bank_data(users)
-        await ctx.send(f"Reset {member.mention}'s account.")
+        old_curve = self.bot.xp_curve
+        if new_curve == old_curve:
+            await ctx.send("Levels already follow the configured XP curve.")
+            return
+
+        counts = {"users": 0, "changed": 0}
+
+        def convert(account):
+            level, xp = new_curve.level_from_total_xp(old_curve.total_xp(account["level"], account["xp"]))
+            counts["users"] += 1
+            if level != account["level"]:
+                counts["changed"] += 1
+            account["level"], account["xp"] = level, xp
+
+        # Switch first so XP earned while the bulk pass runs already uses the new curve
+        self.bot.xp_curve = new_curve
+        await self.store.update_all(convert, op="admin_recomputexp")
+        # Only mark the curve applied once the converted levels are on disk
+        await self.store.flush()
+        await xp_curve.save_applied(new_curve)
+        await ctx.send(f"Recomputed levels for {counts['users']:,} users; {counts['changed']:,} changed level.")
 
     @admin.command(name="reload")
     @commands.is_owner()
@@ -104,30 +98,53 @@ class Admin(commands.Cog):
         except Exception as e:
             await ctx.send(f"Error reloading cog: {e}")
 
+    @admin.command(name="backup")
+    @commands.is_owner()
+    async def backup_users(self, ctx):
+        """Writes a compressed archival copy of every user account."""
+        users = await self.store.all()
+        snapshot = {user_id: copy.deepcopy(account) for user_id, account in users.items()}
+        path = f"data/backups/users-{datetime.now().strftime('%Y%m%d-%H%M%S')}{codec.archive_extension()}"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        await asyncio.to_thread(codec.dump_archive, path, snapshot)
+        await ctx.send(f"Backed up {len(snapshot)} accounts to `{path}`.")
+
     @admin.command(name="blacklist")
     @commands.is_owner()
     async def blacklist_user(self, ctx, member: discord.Member):
         """Blacklists a user from using the bot."""
-        blacklist = await self.get_blacklist()
-        if member.id in blacklist:
+        if not self.blacklist.add_user(member.id):
             await ctx.send("This user is already blacklisted.")
             return
-        blacklist.append(member.id)
-        await self.save_blacklist(blacklist)
         await ctx.send(f"{member.mention} has been blacklisted.")
 
     @admin.command(name="unblacklist")
     @commands.is_owner()
     async def unblacklist_user(self, ctx, member: discord.Member):
         """Unblacklists a user."""
-        blacklist = await self.get_blacklist()
-        if member.id not in blacklist:
+        if not self.blacklist.remove_user(member.id):
             await ctx.send("This user is not blacklisted.")
             return
-        blacklist.remove(member.id)
-        await self.save_blacklist(blacklist)
         await ctx.send(f"{member.mention} has been unblacklisted.")
 
+    @admin.command(name="blacklistguild")
+    @commands.is_owner()
+    async def blacklist_guild(self, ctx, guild_id: int):
+        """Blacklists a whole server from using the bot."""
+        if not self.blacklist.add_guild(guild_id):
+            await ctx.send("This server is already blacklisted.")
+            return
+        await ctx.send(f"Server `{guild_id}` has been blacklisted.")
+
+    @admin.command(name="unblacklistguild")
+    @commands.is_owner()
+    async def unblacklist_guild(self, ctx, guild_id: int):
+        """Unblacklists a server."""
+        if not self.blacklist.remove_guild(guild_id):
+            await ctx.send("This server is not blacklisted.")
+            return
+        await ctx.send(f"Server `{guild_id}` has been unblacklisted.")
+
 
 async def setup(bot):
     await bot.add_cog(Admin(bot))
@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import aiohttp
 from datetime import datetime, timezone
 import json
 import os
@@ -41,24 +40,22 @@ class Dev(commands.Cog):
     @commands.command(name="botavatar")
     @is_owner()
     async def change_avatar(self, ctx, url: str):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    return
-                data = await resp.read()
-                await self.bot.user.edit(avatar=data)
-                await ctx.send("✅ Bot avatar updated.")
+        async with self.bot.session.get(url) as resp:
+            if resp.status != 200:
+                return
+            data = await resp.read()
+        await self.bot.user.edit(avatar=data)
+        await ctx.send("✅ Bot avatar updated.")
 
     @commands.command(name="botbanner")
     @is_owner()
     async def change_banner(self, ctx, url: str):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    return
-                data = await resp.read()
-                await self.bot.user.edit(banner=data)
-                await ctx.send("✅ Bot banner updated.")
+        async with self.bot.session.get(url) as resp:
+            if resp.status != 200:
+                return
+            data = await resp.read()
+        await self.bot.user.edit(banner=data)
+        await ctx.send("✅ Bot banner updated.")
 
     # Server Commands
     @commands.command(name="serverlist")
@@ -155,6 +152,54 @@ class Dev(commands.Cog):
         unique_users = len(set(self.bot.get_all_members()))
         await ctx.send(f"👥 I can see `{unique_users}` unique users across all servers.")
 
+    @commands.command(name="storestats")
+    @is_owner()
+    async def store_stats(self, ctx):
+        """Shows how the user account cache is doing."""
+        stats = self.bot.store.stats()
+        limit = f"{stats['max_hot']:,}" if stats['max_hot'] else "unlimited"
+        em = discord.Embed(title="🗄️ User Store", color=discord.Color.blurple())
+        em.add_field(name="Hot Accounts", value=f"`{stats['hot']:,}` / `{limit}`", inline=True)
+        em.add_field(name="Dirty", value=f"`{stats['dirty']:,}`", inline=True)
+        em.add_field(name="Hit Rate", value=f"`{stats['hit_rate']:.1%}`", inline=True)
+        em.add_field(name="Hits", value=f"`{stats['hits']:,}`", inline=True)
+        em.add_field(name="Misses", value=f"`{stats['misses']:,}`", inline=True)
+        em.add_field(name="Evictions", value=f"`{stats['evictions']:,}`", inline=True)
+        await ctx.send(embed=em)
+
+    @commands.command(name="cardstats")
+    @is_owner()
+    async def card_stats(self, ctx):
+        """Shows how the rank card and avatar caches are doing."""
+        stats = self.bot.card_cache.stats()
+        em = discord.Embed(title="🖼️ Rank Cards", color=discord.Color.blurple())
+        em.add_field(name="Cached Cards", value=f"`{stats['cards']:,}`", inline=True)
+        em.add_field(name="Size", value=f"`{stats['bytes'] / 1024 / 1024:.1f}` / `{stats['max_bytes'] / 1024 / 1024:.0f}` MB", inline=True)
+        em.add_field(name="Hit Rate", value=f"`{stats['hit_rate']:.1%}`", inline=True)
+        em.add_field(name="Hits", value=f"`{stats['hits']:,}`", inline=True)
+        em.add_field(name="Misses", value=f"`{stats['misses']:,}`", inline=True)
+        em.add_field(name="Evictions", value=f"`{stats['evictions']:,}`", inline=True)
+        avatars = self.bot.avatars
+        em.add_field(
+            name="Avatars",
+            value=f"Memory: `{avatars.memory_hits:,}` · Disk: `{avatars.disk_hits:,}` · Downloaded: `{avatars.downloads:,}`",
+            inline=False
+        )
+        await ctx.send(embed=em)
+
+    @commands.command(name="gatestats")
+    @is_owner()
+    async def gate_stats(self, ctx):
+        """Shows what the global command checks cost."""
+        em = discord.Embed(title="🚦 Command Gates", description="In the order they run.", color=discord.Color.blurple())
+        for gate in self.bot.gates.stats():
+            em.add_field(
+                name=gate["name"],
+                value=f"Calls: `{gate['calls']:,}`\nRejected: `{gate['rejections']:,}`\nAvg: `{gate['avg_us']:.1f}µs`",
+                inline=True
+            )
+        await ctx.send(embed=em)
+
     @commands.command(name="setstatus")
     @is_owner()
     async def set_status(self, ctx, status_type: str, *, activity: str = None):
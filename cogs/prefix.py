@@ -1,26 +1,11 @@
 import discord
 from discord.ext import commands
-import json
-import os
+import datetime
 
 class Prefix(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.prefix_file = "data/prefixes.json"
-
-    def get_prefix_data(self):
-        if not os.path.exists(self.prefix_file):
-            return {}
-        try:
-            with open(self.prefix_file, "r") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-
-    def save_prefix_data(self, data):
-        os.makedirs("data", exist_ok=True)
-        with open(self.prefix_file, "w") as f:
-            json.dump(data, f, indent=4)
+        self.prefixes = bot.prefixes
 
     @commands.command(name="setprefix", help="Change the bot prefix for this server (owner only).")
     @commands.has_permissions(administrator=True)
@@ -35,9 +20,7 @@ class Prefix(commands.Cog):
         if not new_prefix.endswith(" "):
             new_prefix += " "
 
-        prefixes = self.get_prefix_data()
-        prefixes[str(ctx.guild.id)] = new_prefix
-        self.save_prefix_data(prefixes)
+        await self.prefixes.set_guild_prefix(ctx.guild.id, new_prefix)
 
         embed = discord.Embed(
             title="✅ Prefix Updated",
@@ -48,8 +31,7 @@ class Prefix(commands.Cog):
 
     @commands.command(name="viewprefix", help="View the current prefix for this server.")
     async def viewprefix(self, ctx):
-        prefixes = self.get_prefix_data()
-        prefix = prefixes.get(str(ctx.guild.id), "cx ")
+        prefix = self.prefixes.guild_prefix(ctx.guild.id)
 
         embed = discord.Embed(
             title="🔧 Current Prefix",
@@ -58,24 +40,8 @@ class Prefix(commands.Cog):
         )
         await ctx.send(embed=embed)
 
-    def get_np_users(self):
-        np_file = "data/np_users.json"
-        if not os.path.exists(np_file):
-            return {}
-        try:
-            with open(np_file, "r") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-
-    def save_np_users(self, data):
-        os.makedirs("data", exist_ok=True)
-        with open("data/np_users.json", "w") as f:
-            json.dump(data, f, indent=4)
-
     def parse_duration(self, duration_str):
         """Parse duration string to calculate expiration time."""
-        import datetime
         duration_str = duration_str.lower().strip()
         if duration_str == "lifetime":
             return "lifetime"
@@ -140,14 +106,9 @@ class Prefix(commands.Cog):
             ))
             return
 
-        np_users = self.get_np_users()
-        np_users[str(user.id)] = {
-            "active": True,
-            "expires_at": expires_at
-        }
-        self.save_np_users(np_users)
+        await self.prefixes.grant_np(user.id, expires_at)
 
-        duration_text = "for a lifetime" if expires_at == "lifetime" else f"until <t:{int(float(expires_at.split('.')[0].replace('-', '').replace(':', '').replace('T', '')))}:F>"
+        duration_text = "for a lifetime" if expires_at == "lifetime" else f"until <t:{int(datetime.datetime.fromisoformat(expires_at).timestamp())}:F>"
         embed = discord.Embed(
             title="✅ No-Prefix Access Granted",
             description=f"{user.mention} can now use commands without a prefix {duration_text}.",
@@ -164,10 +125,7 @@ class Prefix(commands.Cog):
             ))
             return
 
-        np_users = self.get_np_users()
-        if str(user.id) in np_users:
-            del np_users[str(user.id)]
-            self.save_np_users(np_users)
+        if await self.prefixes.revoke_np(user.id):
             embed = discord.Embed(
                 title="✅ No-Prefix Access Revoked",
                 description=f"{user.mention} can no longer use commands without a prefix.",
@@ -190,8 +148,8 @@ class Prefix(commands.Cog):
             ))
             return
 
-        np_users = self.get_np_users()
-        if not np_users:
+        grants = list(self.prefixes.np_grants())
+        if not grants:
             embed = discord.Embed(
                 title="No-Prefix Users",
                 description="No users have no-prefix access.",
@@ -199,11 +157,9 @@ class Prefix(commands.Cog):
             )
         else:
             user_list = []
-            for user_id, data in np_users.items():
-                expires_at = data.get("expires_at", "lifetime")
-                active = data.get("active", False)
+            for user_id, expiry, active in grants:
                 status = "Active" if active else "Expired"
-                expiry_text = "Lifetime" if expires_at == "lifetime" else f"Expires: <t:{int(float(expires_at.split('.')[0].replace('-', '').replace(':', '').replace('T', '')))}:R>"
+                expiry_text = "Lifetime" if expiry is None else f"Expires: <t:{int(expiry.timestamp())}:R>"
                 user_list.append(f"<@{user_id}> - {status} ({expiry_text})")
             embed = discord.Embed(
                 title="No-Prefix Users",
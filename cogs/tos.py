@@ -1,29 +1,19 @@
 import discord
 from discord.ext import commands
-import json
-import os
-
-TOS_FILE = "data/accepted_tos.json"
-
-def get_accepted_tos():
-    """Reads the list of users who have accepted the ToS."""
-    if not os.path.exists(TOS_FILE):
-        return []
-    with open(TOS_FILE, 'r') as f:
-        return json.load(f)
-
-def add_user_to_tos(user_id: int):
-    """Adds a user to the list of those who have accepted the ToS."""
-    accepted = get_accepted_tos()
-    if user_id not in accepted:
-        accepted.append(user_id)
-        with open(TOS_FILE, 'w') as f:
-            json.dump(accepted, f, indent=4)
+import asyncio
+import time
+from collections import OrderedDict
+from utils.tos import TosNotAccepted
+
+PROMPT_TIMEOUT = 180.0
+MAX_PENDING_PROMPTS = 500
 
 class TosView(discord.ui.View):
-    def __init__(self, author: discord.Member):
-        super().__init__(timeout=180.0)
+    def __init__(self, author: discord.Member, cog):
+        super().__init__(timeout=PROMPT_TIMEOUT)
         self.author = author
+        self.cog = cog
+        self.message = None
         self.accepted = False
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
@@ -34,7 +24,7 @@ class TosView(discord.ui.View):
 
     @discord.ui.button(label="I Accept", style=discord.ButtonStyle.green)
     async def accept_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        add_user_to_tos(self.author.id)
+        self.cog.bot.tos.add(self.author.id)
         self.accepted = True
         
         # Edit the original message
@@ -48,22 +38,111 @@ class TosView(discord.ui.View):
         
         await interaction.response.edit_message(embed=new_embed, view=self)
         self.stop()
+        await self.cog.replay(self.author.id)
+
+    async def on_timeout(self):
+        # Clean up the ToS message after timeout if not accepted
+        self.cog.pending.pop(self.author.id, self)
+        await self.cog.delete_prompt(self)
+
+class PendingPrompts:
+    """The open ToS prompt and held-back command of each user, one per user.
+
+    Entries expire after `ttl` seconds, and once `max_size` users are waiting
+    the oldest prompt is dropped to make room.
+    """
+
+    def __init__(self, max_size=MAX_PENDING_PROMPTS, ttl=PROMPT_TIMEOUT):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def get(self, user_id):
+        self._expire()
+        entry = self._entries.get(user_id)
+        return entry[1] if entry else None
+
+    def add(self, user_id, view, ctx):
+        """Stores a new prompt and returns the views that were pushed out to make room."""
+        self._expire()
+        dropped = []
+        while len(self._entries) >= self.max_size:
+            dropped.append(self._entries.popitem(last=False)[1][1])
+        self._entries[user_id] = (time.monotonic() + self.ttl, view, ctx)
+        return dropped
+
+    def pop(self, user_id, view=None):
+        """Removes a user's entry (only if it belongs to `view`, when given) and returns its ctx."""
+        entry = self._entries.get(user_id)
+        if entry is None or (view is not None and entry[1] is not view):
+            return None
+        del self._entries[user_id]
+        return entry[2]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expire(self):
+        now = time.monotonic()
+        # Every entry has the same TTL, so the oldest ones are at the front.
+        while self._entries:
+            user_id, (expires, _, _) = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            del self._entries[user_id]
 
 class Tos(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.pending = PendingPrompts()
 
-    @staticmethod
-    async def require_tos(ctx: commands.Context):
-        """A check that ensures a user has accepted the ToS."""
+    def cog_unload(self):
+        self.bot.gates.remove("tos")
+
+    async def require_tos(self, ctx: commands.Context):
+        """A check that ensures a user has accepted the ToS.
+
+        It never waits on the prompt: the command fails right away and is run
+        again once the user clicks "I Accept".
+        """
         if ctx.command.name == 'help': # Allow help command
              return True
 
-        accepted_users = get_accepted_tos()
-        if ctx.author.id in accepted_users:
+        if ctx.author.id in self.bot.tos:
             return True
 
+        # Already asked; don't stack up another prompt.
+        if self.pending.get(ctx.author.id) is not None:
+            raise TosNotAccepted()
+
         # User has not accepted ToS
+        view = TosView(ctx.author, self)
+        for dropped in self.pending.add(ctx.author.id, view, ctx):
+            dropped.stop()
+            asyncio.create_task(self.delete_prompt(dropped))
+        try:
+            view.message = await ctx.send(embed=self.tos_embed(), view=view)
+        except discord.HTTPException:
+            self.pending.pop(ctx.author.id, view)
+            view.stop()
+            raise
+        raise TosNotAccepted()
+
+    async def replay(self, user_id):
+        """Runs the command that was held back by the ToS prompt."""
+        ctx = self.pending.pop(user_id)
+        if ctx is not None:
+            await self.bot.invoke(ctx)
+
+    async def delete_prompt(self, view):
+        if view.message is None or view.accepted:
+            return
+        try:
+            await view.message.delete()
+        except discord.HTTPException:
+            pass # Message was already deleted or could not be found
+
+    def tos_embed(self):
         em = discord.Embed(
             title="Terms of Service",
             description=(
@@ -80,25 +159,10 @@ class Tos(commands.Cog):
             ),
             color=discord.Color.blue()
         )
-        view = TosView(ctx.author)
-        # Using ephemeral=True makes the message only visible to the user.
-        # The check will fail if the message is not visible for the bot to edit later.
-        # A better approach is to send a public message and delete it after a timeout.
-        # For now, we will send it publicly.
-        message = await ctx.send(embed=em, view=view)
-        
-        await view.wait()
-        
-        # Clean up the ToS message after timeout if not accepted
-        if not view.accepted:
-            try:
-                await message.delete()
-            except discord.NotFound:
-                pass # Message was already deleted or could not be found
-
-        return view.accepted
+        return em
 
 async def setup(bot):
     # Add the check globally
-    bot.add_check(Tos.require_tos)
-    await bot.add_cog(Tos(bot))
+    cog = Tos(bot)
+    bot.gates.add("tos", cog.require_tos)
+    await bot.add_cog(cog)
@@ -2,7 +2,6 @@ import discord
 from discord.ext import commands
 import time
 import datetime
-import json
 
 class Utility(commands.Cog):
     def __init__(self, bot):
@@ -54,17 +53,10 @@ class Utility(commands.Cog):
         if member is None:
             member = ctx.author
 
-        # This is not ideal, but for simplicity we'll read the file here.
-        # A better solution would be a shared data manager class.
-        with open("data/users.json", 'r') as f:
-            users = json.load(f)
-        
-        user_id = str(member.id)
-        if user_id not in users:
+        user_data = await self.bot.store.get(member.id)
+        if user_data is None:
             await ctx.send("This user doesn't have a profile yet. They need to use a command first.")
             return
-
-        user_data = users[user_id]
         
         em = discord.Embed(title=f"{member.name}'s Profile", color=member.color)
         em.set_thumbnail(url=member.avatar.url)
@@ -76,7 +68,7 @@ class Utility(commands.Cog):
         # Leveling Info
         level = user_data.get('level', 1)
         xp = user_data.get('xp', 0)
-        xp_needed = 5 * (level ** 2) + (50 * level) + 100
+        xp_needed = self.bot.xp_curve.xp_needed(level)
         em.add_field(name="Level", value=level)
         em.add_field(name="XP", value=f"{xp}/{xp_needed}")
 
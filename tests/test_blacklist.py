@@ -0,0 +1,57 @@
+import asyncio
+import json
+import os
+import threading
+
+from utils import snapshot
+from utils.blacklist import Blacklist
+
+
+def test_reload_waits_for_pending_saves(tmp_path, monkeypatch):
+    path = tmp_path / "blacklist.json"
+    blacklist = Blacklist(path=str(path), check_interval=0)
+    blacklist.load()
+    second_queued = threading.Event()
+    seen_mid_save = []
+    real_write_atomic = snapshot.write_atomic
+
+    def write_atomic(path, data, compact=True):
+        first = not seen_mid_save
+        if first:
+            second_queued.wait(5)
+        real_write_atomic(path, data, compact)
+        if first:
+            # The first write is on disk, its save hasn't returned and the second is queued
+            seen_mid_save.append(blacklist.is_user_blocked(2))
+
+    monkeypatch.setattr(snapshot, "write_atomic", write_atomic)
+
+    async def run():
+        blacklist.add_user(1)
+        await asyncio.sleep(0.01)
+        blacklist.add_user(2)
+        await asyncio.sleep(0)
+        second_queued.set()
+        while blacklist._saves:
+            await asyncio.gather(*blacklist._saves)
+
+    asyncio.run(run())
+
+    assert seen_mid_save == [True]
+    assert json.loads(path.read_text())["users"] == [1, 2]
+    assert blacklist.is_user_blocked(1) and blacklist.is_user_blocked(2)
+
+    # A hand edit after that is still picked up
+    path.write_text(json.dumps({"users": [1], "guilds": [5]}))
+    os.utime(path, ns=(0, 0))
+    assert not blacklist.is_user_blocked(2)
+    assert blacklist.is_guild_blocked(5)
+
+
+def test_reads_the_old_list_format(tmp_path):
+    path = tmp_path / "blacklist.json"
+    path.write_text(json.dumps([3, 4]))
+    blacklist = Blacklist(path=str(path))
+    blacklist.load()
+    assert blacklist.users == {3, 4}
+    assert blacklist.guilds == frozenset()
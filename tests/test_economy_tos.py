@@ -0,0 +1,93 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+discord = pytest.importorskip("discord")
+from discord.ext import commands, tasks
+
+from cogs.economy import Economy
+from cogs.tos import Tos
+from utils.backends import JsonBackend
+from utils.gates import GatePipeline
+from utils.store import UserStore
+from utils.tos import TosIndex
+
+
+def make_bot(tmp_path):
+    bot = commands.Bot(command_prefix="cx ", intents=discord.Intents.none())
+    bot.store = UserStore(JsonBackend(str(tmp_path / "users.json")))
+    bot.xp = mock.Mock(submit=mock.AsyncMock())
+    bot.gates = GatePipeline()
+    bot.add_check(bot.gates.run)
+    bot.tos = TosIndex(path=str(tmp_path / "accepted_tos.log"), legacy_path=None)
+    bot.tos.load()
+    return bot
+
+
+def make_ctx(bot, command):
+    ctx = mock.MagicMock()
+    ctx.bot = bot
+    ctx.command = command
+    ctx.author.id = 42
+    # Cooldowns read these
+    ctx.message.created_at = discord.utils.utcnow()
+    ctx.message.edited_at = None
+    ctx.send = mock.AsyncMock()
+    return ctx
+
+
+async def setup_cogs(bot):
+    tos = Tos(bot)
+    bot.gates.add("tos", tos.require_tos)
+    with mock.patch.object(tasks.Loop, "start"):
+        economy = Economy(bot)
+    await bot.add_cog(tos)
+    await bot.add_cog(economy)
+    return tos, economy
+
+
+def test_covered_command_only_sends_tos_prompt(tmp_path):
+    async def run():
+        bot = make_bot(tmp_path)
+        # Runs the bot's async setup, which dispatching events needs
+        async with bot:
+            tos, economy = await setup_cogs(bot)
+
+            ctx = make_ctx(bot, economy.work)
+            await bot.invoke(ctx)
+            # Running it again while the prompt is still open must stay quiet too
+            await bot.invoke(ctx)
+
+            assert ctx.send.await_count == 1
+            assert "view" in ctx.send.await_args.kwargs
+            bot.tos.close()
+
+    asyncio.run(run())
+
+
+def test_accepting_runs_the_held_command(tmp_path):
+    async def run():
+        bot = make_bot(tmp_path)
+        async with bot:
+            await bot.store.start()
+            tos, economy = await setup_cogs(bot)
+
+            ctx = make_ctx(bot, economy.work)
+            await bot.invoke(ctx)
+            assert await bot.store.get(42) is None
+
+            bot.tos.add(42)
+            await tos.replay(42)
+
+            account = await bot.store.get(42)
+            assert account["wallet"] > 100
+            assert ctx.send.await_count == 2
+            assert "You worked diligently" in ctx.send.await_args.args[0]
+            bot.xp.submit.assert_awaited_once()
+            # Nothing is held back any more
+            assert tos.pending.get(42) is None
+            await bot.store.close()
+            bot.tos.close()
+
+    asyncio.run(run())
@@ -0,0 +1,116 @@
+import asyncio
+import datetime
+import json
+import os
+import threading
+
+from utils import snapshot
+from utils.prefixes import PrefixResolver
+
+
+class Author:
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+class Message:
+    def __init__(self, user_id):
+        self.author = Author(user_id)
+        self.guild = None
+
+
+def make_resolver(tmp_path, np_users):
+    np_path = tmp_path / "np_users.json"
+    np_path.write_text(json.dumps(np_users))
+    resolver = PrefixResolver(prefix_path=str(tmp_path / "prefixes.json"), np_path=str(np_path))
+    resolver.load()
+    return resolver
+
+
+def test_load_with_tz_aware_and_naive_expiries(tmp_path):
+    soon = datetime.datetime.now() + datetime.timedelta(hours=1)
+    aware = soon.astimezone(datetime.timezone.utc)
+    resolver = make_resolver(tmp_path, {
+        "1": {"active": True, "expires_at": soon.isoformat()},
+        "2": {"active": True, "expires_at": aware.isoformat()},
+        "3": {"active": True, "expires_at": "lifetime"},
+    })
+
+    for user_id in (1, 2, 3):
+        assert resolver.resolve(Message(user_id)) == resolver.no_prefix
+    expiries = {user_id: expiry for user_id, expiry, _ in resolver.np_grants()}
+    assert expiries[2].tzinfo is None
+    assert abs((expiries[2] - soon).total_seconds()) < 1
+
+
+def test_grant_np_with_tz_aware_expiry(tmp_path):
+    async def run():
+        resolver = make_resolver(tmp_path, {
+            "1": {"active": True, "expires_at": (datetime.datetime.now() + datetime.timedelta(days=1)).isoformat()},
+        })
+        aware = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=2)
+        await resolver.grant_np(2, aware.isoformat())
+        assert resolver.resolve(Message(2)) == resolver.no_prefix
+
+    asyncio.run(run())
+
+
+def test_expiry_loop_expires_tz_aware_grant(tmp_path):
+    async def run():
+        past = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(minutes=1)
+        resolver = make_resolver(tmp_path, {
+            "1": {"active": True, "expires_at": past.isoformat()},
+            "2": {"active": True, "expires_at": (datetime.datetime.now() + datetime.timedelta(days=1)).isoformat()},
+        })
+        resolver.start()
+        for _ in range(100):
+            if resolver.resolve(Message(1)) == resolver.default:
+                break
+            await asyncio.sleep(0.01)
+        assert resolver.resolve(Message(1)) == resolver.default
+        assert resolver.resolve(Message(2)) == resolver.no_prefix
+        assert not resolver._task.done()
+        await resolver.close()
+
+    asyncio.run(run())
+
+
+def test_reload_waits_for_pending_saves(tmp_path, monkeypatch):
+    np_path = tmp_path / "np_users.json"
+    resolver = PrefixResolver(prefix_path=str(tmp_path / "prefixes.json"), np_path=str(np_path), check_interval=0)
+    resolver.load()
+    second_queued = threading.Event()
+    seen_mid_save = []
+    real_write_atomic = snapshot.write_atomic
+
+    def write_atomic(path, data, compact=True):
+        first = not seen_mid_save
+        if first:
+            second_queued.wait(5)
+        real_write_atomic(path, data, compact)
+        if first:
+            # The first write is on disk, its save hasn't returned and the second is queued.
+            # The event loop is parked waiting on us, so this can't race it.
+            seen_mid_save.append(resolver.resolve(Message(2)))
+
+    monkeypatch.setattr(snapshot, "write_atomic", write_atomic)
+
+    async def run():
+        first = asyncio.create_task(resolver.grant_np(1, "lifetime"))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(resolver.grant_np(2, "lifetime"))
+        await asyncio.sleep(0)
+        second_queued.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(run())
+
+    assert seen_mid_save == [resolver.no_prefix]
+    assert set(json.loads(np_path.read_text())) == {"1", "2"}
+    for user_id in (1, 2):
+        assert resolver.resolve(Message(user_id)) == resolver.no_prefix
+
+    # A hand edit after that is still picked up
+    np_path.write_text(json.dumps({"1": {"active": True, "expires_at": "lifetime"}}))
+    os.utime(np_path, ns=(0, 0))
+    assert resolver.resolve(Message(2)) == resolver.default
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from utils.journal import Journal
+
+
+def test_journal_replay_skips_a_torn_last_line(tmp_path):
+    journal = Journal(str(tmp_path / "users.journal"))
+    journal.open()
+    journal.append("work", 1, {"wallet": 150})
+    journal.append("work", 1, {"wallet": 300})
+    journal.close()
+    with open(journal.path, 'ab') as f:
+        f.write(b'{"op": "work", "id": "2", "a": {"wal')
+
+    users = {}
+    assert journal.replay(users) == {"1"}
+    assert users == {"1": {"wallet": 300}}
+
+
+def test_tos_log_drops_torn_and_outdated_lines(tmp_path):
+    pytest.importorskip("discord")
+    from utils.tos import TosIndex
+
+    path = tmp_path / "accepted_tos.log"
+    path.write_bytes(
+        json.dumps({"id": 1, "v": 1}).encode() + b"\n"
+        + json.dumps({"id": 2, "v": 2}).encode() + b"\n"
+        + b'{"id": 3, "v'
+    )
+    index = TosIndex(path=str(path), version=2, legacy_path=None)
+    index.load()
+    index.add(4)
+    index.close()
+
+    assert index.accepted == {2, 4}
+    assert [json.loads(line) for line in path.read_bytes().splitlines()] == [{"id": 2, "v": 2}, {"id": 4, "v": 2}]
@@ -0,0 +1,135 @@
+import asyncio
+import os
+from collections import OrderedDict
+
+
+class AvatarCache:
+    """Avatar images keyed by Discord's avatar hash and the requested size.
+
+    A changed avatar gets a new hash, so entries never go stale. Hits are
+    served from an in-memory LRU (capped at `max_memory_bytes`), then from
+    `directory` on disk, and only then downloaded with the shared `session`.
+    Concurrent requests for the same avatar share one download.
+
+    Old hashes are never asked for again, so the disk tier is capped at
+    `max_disk_bytes`: `prune` drops the least recently used files (by mtime,
+    which disk hits refresh) and runs at startup and whenever a download
+    pushes the directory over the cap.
+    """
+
+    def __init__(self, session, directory="data/avatars", max_memory_bytes=32 * 1024 * 1024, size=256,
+                 max_disk_bytes=256 * 1024 * 1024):
+        self.session = session
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.size = size
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.downloads = 0
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._fetching = {}
+        self._disk_bytes = 0
+        self._pruning = None
+
+    async def get(self, user):
+        """Returns the user's avatar as static image bytes, or None if it couldn't be fetched."""
+        asset = user.display_avatar.with_size(self.size).with_static_format("png")
+        key = f"{asset.key}-{self.size}"
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return data
+        task = self._fetching.get(key)
+        if task is None:
+            task = self._fetching[key] = asyncio.ensure_future(self._load(key, asset.url))
+            task.add_done_callback(lambda _: self._fetching.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _load(self, key, url):
+        path = os.path.join(self.directory, key + ".png")
+        data = await asyncio.to_thread(self._read, path)
+        if data is not None:
+            self.disk_hits += 1
+        else:
+            async with self.session.get(url) as resp:
+                if resp.status != 200:
+                    return None
+                data = await resp.read()
+            self.downloads += 1
+            await asyncio.to_thread(self._write, path, data)
+            self._disk_bytes += len(data)
+            if self._disk_bytes > self.max_disk_bytes and self._pruning is None:
+                self._pruning = asyncio.ensure_future(self.prune())
+        self._remember(key, data)
+        return data
+
+    def _remember(self, key, data):
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    async def prune(self):
+        """Deletes the least recently used avatars until the disk tier fits in `max_disk_bytes`."""
+        try:
+            self._disk_bytes = await asyncio.to_thread(self._prune, self.directory, self.max_disk_bytes)
+        except Exception as e:
+            print(f"Failed to prune the avatar cache: {e}")
+        finally:
+            self._pruning = None
+
+    @staticmethod
+    def _prune(directory, max_bytes):
+        files = []
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.name.endswith(".tmp"):
+                    # Left over from a write that never finished
+                    os.remove(entry.path)
+                elif entry.name.endswith(".png"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+            except FileNotFoundError:
+                pass
+        total = sum(size for _, size, _ in files)
+        # Go a bit below the cap so the next prune isn't a few downloads away
+        target = max_bytes * 0.9
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            # Mark it as recently used for prune
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    @staticmethod
+    def _write(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
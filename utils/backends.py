@@ -0,0 +1,352 @@
+import asyncio
+import copy
+import os
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from . import codec
+from .snapshot import snapshots
+
+# Columns every account has. Anything else on a record is kept in the `extra` column.
+ACCOUNT_FIELDS = ("wallet", "bank", "level", "xp", "inventory", "daily_streak", "last_daily", "pet", "job")
+NUMERIC_FIELDS = ("wallet", "bank", "level", "xp", "daily_streak")
+
+
+class JsonBackend:
+    """Stores every account in a single JSON file that is rewritten on each save."""
+
+    def __init__(self, path="data/users.json"):
+        self.path = path
+
+    async def load(self):
+        return await asyncio.to_thread(self._read)
+
+    async def save(self, users, dirty):
+        # Copy on the loop so the worker thread never sees a dict mid-update.
+        snapshot = {
+            user_id: {**account, "inventory": account.get("inventory", {}).copy()}
+            for user_id, account in users.items()
+        }
+        await snapshots.save(self.path, snapshot)
+
+    async def close(self):
+        pass
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        return codec.read(self.path)
+
+
+class ShardedJsonBackend:
+    """Splits accounts across `shard_count` JSON files keyed by user id.
+
+    Only the shards that contain dirty accounts are rewritten on save, and
+    all shards are read in parallel at startup. Changing `shard_count`
+    rebalances the files on the next start. Single accounts are read from
+    their shard file, so the store can keep cold accounts out of memory; the
+    last `cached_shards` parsed shards are kept around so reading several
+    cold accounts from one shard doesn't parse the file again each time.
+    """
+
+    lazy = True
+
+    def __init__(self, directory="data/users", shard_count=16, migrate_from="data/users.json", cached_shards=2):
+        self.directory = directory
+        self.shard_count = shard_count
+        self.migrate_from = migrate_from
+        self.cached_shards = cached_shards
+        self._members = {}
+        self._shard_cache = OrderedDict()
+        self._shard_reads = {}
+        # Bumped on every write, so a read that raced a write is never cached or shared
+        self._generation = {}
+
+    def shard_of(self, user_id):
+        return int(user_id) % self.shard_count
+
+    def shard_path(self, shard):
+        return os.path.join(self.directory, f"{shard:02d}.json")
+
+    async def load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        paths = sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.endswith(".json") and name[:-5].isdigit()
+        )
+        shards = await asyncio.gather(*(asyncio.to_thread(self._read, path) for path in paths))
+        users = {}
+        for shard in shards:
+            users.update(shard)
+
+        rebalance = False
+        if not paths and self.migrate_from and os.path.exists(self.migrate_from):
+            users = await asyncio.to_thread(self._read, self.migrate_from)
+            print(f"Migrating {len(users)} accounts from {self.migrate_from} into {self.shard_count} shards.")
+            rebalance = True
+        elif any(path != self.shard_path(self.shard_of(user_id)) for path, shard in zip(paths, shards) for user_id in shard):
+            rebalance = True
+
+        self._members = {}
+        for user_id in users:
+            self._members.setdefault(self.shard_of(user_id), set()).add(user_id)
+        if rebalance:
+            await self._write_shards(users, range(self.shard_count))
+            expected = {self.shard_path(shard) for shard in range(self.shard_count)}
+            for path in paths:
+                if path not in expected:
+                    os.remove(path)
+        return users
+
+    async def load_one(self, user_id):
+        shard = self.shard_of(user_id)
+        # _members knows every stored id, so unknown users never touch the disk.
+        if user_id not in self._members.get(shard, ()):
+            return None
+        accounts = self._shard_cache.get(shard)
+        if accounts is not None:
+            self._shard_cache.move_to_end(shard)
+        else:
+            accounts = await self._read_shard(shard)
+        account = accounts.get(user_id)
+        # The cached shard must never share dicts with the store's live accounts
+        return copy.deepcopy(account) if account is not None else None
+
+    async def _read_shard(self, shard):
+        """Reads a shard file, sharing one read between concurrent callers."""
+        key = (shard, self._generation.get(shard, 0))
+        task = self._shard_reads.get(key)
+        if task is None:
+            task = self._shard_reads[key] = asyncio.ensure_future(self._fetch_shard(shard, key[1]))
+            task.add_done_callback(lambda _: self._shard_reads.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_shard(self, shard, generation):
+        accounts = await asyncio.to_thread(self._read, self.shard_path(shard))
+        if self._generation.get(shard, 0) == generation:
+            self._shard_cache[shard] = accounts
+            while len(self._shard_cache) > self.cached_shards:
+                self._shard_cache.popitem(last=False)
+        return accounts
+
+    def _invalidate(self, shard):
+        self._generation[shard] = self._generation.get(shard, 0) + 1
+        self._shard_cache.pop(shard, None)
+
+    async def load_all(self):
+        paths = [self.shard_path(shard) for shard in self._members]
+        shards = await asyncio.gather(*(asyncio.to_thread(self._read, path) for path in paths if os.path.exists(path)))
+        users = {}
+        for shard in shards:
+            users.update(shard)
+        return users
+
+    async def save(self, users, dirty):
+        shards = set()
+        for user_id in dirty:
+            shard = self.shard_of(user_id)
+            self._members.setdefault(shard, set()).add(user_id)
+            shards.add(shard)
+        await self._write_shards(users, shards)
+
+    async def update_all(self, fn, skip=()):
+        """Applies `fn` to every stored account not in `skip`, one shard file at a time.
+
+        Only shards where something changed are written back. Returns
+        {user_id: result} for the calls of `fn` that returned something.
+        """
+        results = {}
+        for shard in list(self._members):
+            path = self.shard_path(shard)
+            if not os.path.exists(path):
+                continue
+            accounts = await asyncio.to_thread(self._read, path)
+            changed = False
+            for user_id, account in accounts.items():
+                if user_id in skip:
+                    continue
+                before = copy.deepcopy(account)
+                result = fn(account)
+                if result is not None:
+                    results[user_id] = result
+                changed = changed or account != before
+            if changed:
+                self._invalidate(shard)
+                await snapshots.save(path, accounts)
+                self._invalidate(shard)
+        return results
+
+    async def close(self):
+        pass
+
+    async def _write_shards(self, users, shards):
+        # Shards with accounts that were evicted from memory are merged with their file on disk.
+        partial = [
+            shard for shard in shards
+            if os.path.exists(self.shard_path(shard)) and not self._members.get(shard, set()) <= users.keys()
+        ]
+        on_disk = {shard: self._shard_cache[shard] for shard in partial if shard in self._shard_cache}
+        missing = [shard for shard in partial if shard not in on_disk]
+        on_disk.update(zip(missing, await asyncio.gather(
+            *(asyncio.to_thread(self._read, self.shard_path(shard)) for shard in missing)
+        )))
+        writes = []
+        for shard in shards:
+            cold = on_disk.get(shard, {})
+            # Copy on the loop so the worker thread never sees a dict mid-update.
+            snapshot = {}
+            for user_id in self._members.get(shard, ()):
+                account = users.get(user_id) or cold.get(user_id)
+                if account is not None:
+                    snapshot[user_id] = {**account, "inventory": account.get("inventory", {}).copy()}
+            self._invalidate(shard)
+            writes.append(snapshots.save(self.shard_path(shard), snapshot))
+        await asyncio.gather(*writes)
+        for shard in shards:
+            self._invalidate(shard)
+
+    @staticmethod
+    def _read(path):
+        return codec.read(path)
+
+
+class SqliteBackend:
+    """Stores one row per account in a SQLite database running in WAL mode.
+
+    Saves only touch the rows of dirty accounts. All database calls run on a
+    single worker thread so the connection is never shared between threads.
+    Single accounts are point reads by primary key, so the store can keep
+    cold accounts out of memory.
+    """
+
+    lazy = True
+
+    def __init__(self, path="data/users.db", migrate_from="data/users.json"):
+        self.path = path
+        self.migrate_from = migrate_from
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conn = None
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def load(self):
+        await self._run(self._connect)
+        return await self._run(self._read_all)
+
+    async def load_one(self, user_id):
+        return await self._run(self._read_one, user_id)
+
+    async def load_all(self):
+        return await self._run(self._read_all)
+
+    async def save(self, users, dirty):
+        rows = [self._to_row(user_id, users[user_id]) for user_id in dirty if user_id in users]
+        if rows:
+            await self._run(self._upsert, rows)
+
+    async def update_all(self, fn, skip=(), batch_size=500):
+        """Applies `fn` to every stored account not in `skip`, `batch_size` rows at a time.
+
+        Only changed rows are written back. Returns {user_id: result} for the
+        calls of `fn` that returned something.
+        """
+        results = {}
+        last_id = ""
+        while True:
+            rows = await self._run(self._read_page, last_id, batch_size)
+            if not rows:
+                return results
+            last_id = rows[-1][0]
+            changed = []
+            for row in rows:
+                user_id = row[0]
+                if user_id in skip:
+                    continue
+                account = self._from_row(row)
+                before = copy.deepcopy(account)
+                result = fn(account)
+                if result is not None:
+                    results[user_id] = result
+                if account != before:
+                    changed.append(self._to_row(user_id, account))
+            if changed:
+                await self._run(self._upsert, changed)
+
+    async def close(self):
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            "id TEXT PRIMARY KEY, wallet INTEGER, bank INTEGER, level INTEGER, xp INTEGER, "
+            "inventory TEXT, daily_streak INTEGER, last_daily TEXT, pet TEXT, job TEXT, extra TEXT)"
+        )
+        self._conn.commit()
+        # user_version marks that the one-shot JSON import has already happened.
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            self._migrate_json()
+            self._conn.execute("PRAGMA user_version = 1")
+            self._conn.commit()
+
+    def _migrate_json(self):
+        if not self.migrate_from or not os.path.exists(self.migrate_from):
+            return
+        users = codec.read(self.migrate_from)
+        self._upsert([self._to_row(user_id, account) for user_id, account in users.items()])
+        print(f"Migrated {len(users)} accounts from {self.migrate_from} to {self.path}.")
+
+    def _read_all(self):
+        cursor = self._conn.execute("SELECT id, " + ", ".join(ACCOUNT_FIELDS) + ", extra FROM users")
+        return {row[0]: self._from_row(row) for row in cursor}
+
+    def _read_one(self, user_id):
+        row = self._conn.execute(
+            "SELECT id, " + ", ".join(ACCOUNT_FIELDS) + ", extra FROM users WHERE id = ?", (str(user_id),)
+        ).fetchone()
+        return self._from_row(row) if row else None
+
+    def _read_page(self, after_id, limit):
+        return self._conn.execute(
+            "SELECT id, " + ", ".join(ACCOUNT_FIELDS) + ", extra FROM users WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit)
+        ).fetchall()
+
+    def _upsert(self, rows):
+        columns = ("id",) + ACCOUNT_FIELDS + ("extra",)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns[1:])
+        self._conn.executemany(
+            f"INSERT INTO users ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}",
+            rows
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _to_row(user_id, account):
+        extra = {key: value for key, value in account.items() if key not in ACCOUNT_FIELDS}
+        values = [account.get(field) for field in ACCOUNT_FIELDS]
+        values[ACCOUNT_FIELDS.index("inventory")] = codec.dumps(account.get("inventory", {})).decode()
+        return (str(user_id), *values, codec.dumps(extra).decode() if extra else None)
+
+    @staticmethod
+    def _from_row(row):
+        account = dict(zip(ACCOUNT_FIELDS, row[1:-1]))
+        account["inventory"] = codec.loads(account["inventory"] or "{}")
+        # Counters are never legitimately NULL; leave them out so the schema migration fills them in.
+        for field in NUMERIC_FIELDS:
+            if account[field] is None:
+                del account[field]
+        if row[-1]:
+            account.update(codec.loads(row[-1]))
+        return account
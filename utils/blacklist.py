@@ -0,0 +1,91 @@
+import asyncio
+
+from .watched_file import WatchedFile
+
+
+class Blacklist:
+    """Blacklisted user and guild ids, kept in memory for the global command check.
+
+    Both sets are frozensets that get swapped out whole on every change, so a
+    check never sees a half-applied update. Changes are saved in the
+    background. The file is reloaded when its mtime changes (checked at most
+    every `check_interval` seconds), so hand edits still apply.
+
+    The file used to be a plain list of user ids; that format is still read,
+    and the next save turns it into {"users": [...], "guilds": [...]}.
+    """
+
+    def __init__(self, path="data/blacklist.json", check_interval=5.0):
+        self.path = path
+        self.users = frozenset()
+        self.guilds = frozenset()
+        self._file = WatchedFile(path, check_interval)
+        self._saves = set()
+
+    def load(self):
+        data = None
+        try:
+            data = self._file.read()
+        except ValueError as e:
+            print(f"Could not read {self.path}, ignoring it: {e}")
+        if data is None:
+            data = {}
+        elif isinstance(data, list):
+            data = {"users": data}
+        self.users = frozenset(int(user_id) for user_id in data.get("users", []))
+        self.guilds = frozenset(int(guild_id) for guild_id in data.get("guilds", []))
+
+    def is_user_blocked(self, user_id):
+        self._maybe_reload()
+        return user_id in self.users
+
+    def is_guild_blocked(self, guild_id):
+        self._maybe_reload()
+        return guild_id in self.guilds
+
+    def add_user(self, user_id):
+        """Blacklists a user. Returns False if they already were."""
+        if user_id in self.users:
+            return False
+        self.users = self.users | {user_id}
+        self._persist()
+        return True
+
+    def remove_user(self, user_id):
+        """Takes a user off the blacklist. Returns False if they weren't on it."""
+        if user_id not in self.users:
+            return False
+        self.users = self.users - {user_id}
+        self._persist()
+        return True
+
+    def add_guild(self, guild_id):
+        """Blacklists a whole guild. Returns False if it already was."""
+        if guild_id in self.guilds:
+            return False
+        self.guilds = self.guilds | {guild_id}
+        self._persist()
+        return True
+
+    def remove_guild(self, guild_id):
+        """Takes a guild off the blacklist. Returns False if it wasn't on it."""
+        if guild_id not in self.guilds:
+            return False
+        self.guilds = self.guilds - {guild_id}
+        self._persist()
+        return True
+
+    def _persist(self):
+        task = asyncio.ensure_future(self._save({"users": sorted(self.users), "guilds": sorted(self.guilds)}))
+        self._saves.add(task)
+        task.add_done_callback(self._saves.discard)
+
+    async def _save(self, data):
+        try:
+            await self._file.save(data)
+        except Exception as e:
+            print(f"Failed to save the blacklist: {e}")
+
+    def _maybe_reload(self):
+        if self._file.changed():
+            self.load()
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+
+
+class CardCache:
+    """Rendered rank card PNGs, keyed by everything that shows on the card.
+
+    The key is (user id, avatar hash, display name, level, xp bucket), where
+    the bucket is how far along the progress bar the user is, in
+    `xp_buckets` steps. A cached card can therefore show an XP number that
+    is a little behind, but repeat `rank` calls are a dict lookup instead of
+    a render. Entries are evicted least recently used once they take up more
+    than `max_bytes`, and `invalidate` drops a user's cards on level-up.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, xp_buckets=50):
+        self.max_bytes = max_bytes
+        self.xp_buckets = xp_buckets
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cards = OrderedDict()
+        self._bytes = 0
+        # user id -> keys of their cached cards, so invalidate doesn't scan everything
+        self._by_user = {}
+
+    def key(self, user_id, avatar_hash, name, level, xp, xp_needed):
+        bucket = min(xp * self.xp_buckets // xp_needed, self.xp_buckets) if xp_needed > 0 else 0
+        return (str(user_id), avatar_hash, name, level, bucket)
+
+    def get(self, key):
+        card = self._cards.get(key)
+        if card is None:
+            self.misses += 1
+            return None
+        self._cards.move_to_end(key)
+        self.hits += 1
+        return card
+
+    def put(self, key, card):
+        if len(card) > self.max_bytes:
+            return
+        self._drop(key)
+        self._cards[key] = card
+        self._bytes += len(card)
+        self._by_user.setdefault(key[0], set()).add(key)
+        while self._bytes > self.max_bytes:
+            old_key = next(iter(self._cards))
+            self._drop(old_key)
+            self.evictions += 1
+
+    def invalidate(self, user_id):
+        """Forgets every cached card of a user."""
+        for key in list(self._by_user.get(str(user_id), ())):
+            self._drop(key)
+
+    def _drop(self, key):
+        card = self._cards.pop(key, None)
+        if card is None:
+            return
+        self._bytes -= len(card)
+        keys = self._by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[key[0]]
+
+    def stats(self):
+        """Returns the cache counters, e.g. for a debug command."""
+        lookups = self.hits + self.misses
+        return {
+            "cards": len(self._cards),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,69 @@
+import gzip
+import json
+
+# orjson and msgpack are optional speedups; plain json is always available.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def dumps(obj, compact=True):
+    """Encodes `obj` as JSON bytes. `compact` drops all indentation and spacing."""
+    if orjson is not None:
+        return orjson.dumps(obj) if compact else orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    if compact:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    return json.dumps(obj, indent=4).encode("utf-8")
+
+
+def loads(data):
+    """Decodes JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def read(path):
+    """Reads and decodes a JSON file."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def read_records(path):
+    """Yields the decoded record of each line of a JSON-lines log, or None for a line that doesn't decode.
+
+    A crash mid-append can leave a partial last line behind; callers skip those.
+    """
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                yield loads(line)
+            except ValueError:
+                yield None
+
+
+def archive_extension():
+    """File extension used by `dump_archive` with the libraries installed."""
+    return ".msgpack.gz" if msgpack is not None else ".json.gz"
+
+
+def dump_archive(path, obj):
+    """Writes a gzip-compressed archival copy of `obj`, using msgpack when available."""
+    data = msgpack.packb(obj) if path.endswith(".msgpack.gz") else dumps(obj)
+    with gzip.open(path, 'wb') as f:
+        f.write(data)
+
+
+def load_archive(path):
+    """Reads a file written by `dump_archive`."""
+    with gzip.open(path, 'rb') as f:
+        data = f.read()
+    if path.endswith(".msgpack.gz"):
+        return msgpack.unpackb(data)
+    return loads(data)
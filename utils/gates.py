@@ -0,0 +1,65 @@
+import time
+
+from discord.ext import commands
+
+
+class Gate:
+    """One named check in a GatePipeline, with its counters."""
+
+    def __init__(self, name, check):
+        self.name = name
+        self.check = check
+        self.calls = 0
+        self.rejections = 0
+        self.total_ns = 0
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "rejections": self.rejections,
+            "avg_us": self.total_ns / self.calls / 1000 if self.calls else 0.0,
+        }
+
+
+class GatePipeline:
+    """Runs the global pre-command checks in order and stops at the first rejection.
+
+    Register the pipeline once with `bot.add_check(pipeline.run)` and add
+    gates cheapest first. A gate is an async `check(ctx)` that returns a bool
+    or raises `commands.CheckFailure`, just like a normal bot check. Every
+    gate counts its calls, rejections and the time spent in it.
+    """
+
+    def __init__(self):
+        self.gates = []
+
+    def add(self, name, check):
+        """Appends a gate, or swaps the check of an existing gate with the same name in place."""
+        for gate in self.gates:
+            if gate.name == name:
+                gate.check = check
+                return
+        self.gates.append(Gate(name, check))
+
+    def remove(self, name):
+        self.gates = [gate for gate in self.gates if gate.name != name]
+
+    async def run(self, ctx):
+        for gate in self.gates:
+            gate.calls += 1
+            start = time.perf_counter_ns()
+            try:
+                passed = await gate.check(ctx)
+            except commands.CheckFailure:
+                gate.rejections += 1
+                raise
+            finally:
+                gate.total_ns += time.perf_counter_ns() - start
+            if not passed:
+                gate.rejections += 1
+                return False
+        return True
+
+    def stats(self):
+        return [gate.stats() for gate in self.gates]
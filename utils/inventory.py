@@ -0,0 +1,65 @@
+def item_id(name):
+    """Normalizes an item name the way inventories key it ("Fishing Rod" -> "fishing rod")."""
+    return name.strip().lower()
+
+
+def display_name(item):
+    """Turns an item id back into the name shown to users."""
+    return item.title()
+
+
+def from_list(items):
+    """Converts the old list-of-names inventory into an {item id: quantity} map."""
+    counts = {}
+    for name in items:
+        key = item_id(name)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+class Inventory:
+    """Item counts for one account.
+
+    Wraps the account's own `inventory` dict, so changes land directly in the
+    account. Every lookup accepts either an item id or a display name.
+    """
+
+    def __init__(self, items):
+        self.items = items
+
+    @classmethod
+    def of(cls, account):
+        return cls(account.setdefault("inventory", {}))
+
+    def count(self, item):
+        return self.items.get(item_id(item), 0)
+
+    def add(self, item, quantity=1):
+        key = item_id(item)
+        self.items[key] = self.items.get(key, 0) + quantity
+
+    def remove(self, item, quantity=1):
+        """Takes `quantity` of an item out. Returns False (and changes nothing) if there aren't enough."""
+        key = item_id(item)
+        have = self.items.get(key, 0)
+        if have < quantity:
+            return False
+        if have == quantity:
+            del self.items[key]
+        else:
+            self.items[key] = have - quantity
+        return True
+
+    def pop(self, item):
+        """Removes every copy of an item and returns how many there were."""
+        return self.items.pop(item_id(item), 0)
+
+    def __contains__(self, item):
+        return self.count(item) > 0
+
+    def __iter__(self):
+        """Yields (item id, quantity) pairs."""
+        return iter(list(self.items.items()))
+
+    def __len__(self):
+        return len(self.items)
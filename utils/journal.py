@@ -0,0 +1,64 @@
+import os
+
+from . import codec
+
+
+class Journal:
+    """Append-only log of account changes, folded into the main snapshot on every flush.
+
+    Each line holds the operation name and the full state of the touched
+    account afterwards, so replaying a record twice is harmless. When a flush
+    starts, the live journal is rotated to `<path>.old`; that file is only
+    removed once the snapshot containing its changes has been written.
+    """
+
+    def __init__(self, path="data/users.journal"):
+        self.path = path
+        self.old_path = path + ".old"
+        self._file = None
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'ab')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def append(self, op, user_id, account):
+        """Records the new state of one account."""
+        record = {"op": op, "id": str(user_id), "a": account}
+        self._file.write(codec.dumps(record) + b"\n")
+        self._file.flush()
+
+    def replay(self, users):
+        """Applies every record left over from the last run and returns the ids it touched."""
+        touched = set()
+        for path in (self.old_path, self.path):
+            if not os.path.exists(path):
+                continue
+            for record in codec.read_records(path):
+                if record is None:
+                    continue
+                users[record["id"]] = record["a"]
+                touched.add(record["id"])
+        return touched
+
+    def rotate(self):
+        """Starts a fresh journal, keeping the current one until the next snapshot is safe."""
+        self.close()
+        if os.path.exists(self.path):
+            if os.path.exists(self.old_path):
+                # The previous compaction failed; keep both sets of records.
+                with open(self.old_path, 'ab') as old, open(self.path, 'rb') as new:
+                    old.write(new.read())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.old_path)
+        self.open()
+
+    def discard_rotated(self):
+        """Drops the rotated journal once its changes are part of the snapshot."""
+        if os.path.exists(self.old_path):
+            os.remove(self.old_path)
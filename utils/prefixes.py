@@ -0,0 +1,213 @@
+import asyncio
+import copy
+import datetime
+import heapq
+
+from .watched_file import WatchedFile
+
+DEFAULT_PREFIX = "cx "
+
+
+def parse_expiry(expires_at):
+    """Parses an ISO expiry into a naive local datetime, the kind datetime.now() returns.
+
+    Grants are written in local time without an offset, but a hand-edited
+    file may carry one; those are converted so every heap entry compares.
+    """
+    expiry = datetime.datetime.fromisoformat(expires_at)
+    if expiry.tzinfo is not None:
+        expiry = expiry.astimezone().replace(tzinfo=None)
+    return expiry
+
+
+class PrefixResolver:
+    """Answers the bot's get_prefix from memory.
+
+    Guild prefixes and no-prefix grants are loaded once and kept as ready-made
+    prefix tuples, so resolving a message is a couple of dict lookups. The
+    prefix cog changes them through this class, which saves the files in the
+    background. If a file is edited by hand, it is picked up the next time its
+    mtime is checked (at most every `check_interval` seconds).
+
+    Timed no-prefix grants sit in a min-heap keyed by expiry. One background
+    task sleeps until the earliest one runs out, deactivates everything that
+    is due and saves the file once, so resolving a message never looks at dates.
+    """
+
+    def __init__(self, prefix_path="data/prefixes.json", np_path="data/np_users.json", check_interval=5.0):
+        self.prefix_path = prefix_path
+        self.np_path = np_path
+        self.check_interval = check_interval
+        self.default = (DEFAULT_PREFIX,)
+        # discord.py uses the first prefix that matches, so "" has to come last.
+        self.no_prefix = (DEFAULT_PREFIX, "")
+        self.prefixes = {}
+        self.np_users = {}
+        self.np_file_ok = False
+        self._guild_prefixes = {}
+        self._np_active = set()
+        self._np_inactive = set()
+        self._np_expiry = {}
+        self._expiry_heap = []
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._prefix_file = WatchedFile(prefix_path, check_interval)
+        self._np_file = WatchedFile(np_path, check_interval)
+
+    def load(self):
+        """Reads both files from disk."""
+        self._load_prefixes()
+        self._load_np_users()
+
+    def start(self):
+        """Starts the background task that expires timed no-prefix grants."""
+        self._task = asyncio.create_task(self._expiry_loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def resolve(self, message, owner_id=None):
+        """Returns the prefixes that apply to `message`."""
+        self._maybe_reload()
+        user_id = message.author.id
+        if user_id in self._np_active:
+            return self.no_prefix
+        if user_id in self._np_inactive:
+            return self.default
+        if not self.np_file_ok and user_id == owner_id:
+            return self.no_prefix
+        if message.guild is None:
+            return self.default
+        return self._guild_prefixes.get(message.guild.id, self.default)
+
+    def np_grants(self):
+        """Yields (user id, expiry datetime or None, active) for every no-prefix grant.
+
+        Lifetime grants come first, then timed grants in expiry order straight
+        from the heap, then grants that are no longer active.
+        """
+        for user_id in self._np_active:
+            if user_id not in self._np_expiry:
+                yield user_id, None, True
+        for expiry, user_id in sorted(self._expiry_heap):
+            if self._np_expiry.get(user_id) == expiry and user_id in self._np_active:
+                yield user_id, expiry, True
+        for user_id in self._np_inactive:
+            yield user_id, self._np_expiry.get(user_id), False
+
+    def guild_prefix(self, guild_id):
+        return self.prefixes.get(str(guild_id), DEFAULT_PREFIX)
+
+    async def set_guild_prefix(self, guild_id, prefix):
+        self.prefixes[str(guild_id)] = prefix
+        self._guild_prefixes[int(guild_id)] = (prefix,)
+        await self._prefix_file.save(dict(self.prefixes))
+
+    async def grant_np(self, user_id, expires_at):
+        """Gives a user no-prefix access until `expires_at` (an ISO timestamp or "lifetime")."""
+        self.np_users[str(user_id)] = {"active": True, "expires_at": expires_at}
+        self.np_file_ok = True
+        self._index_np_user(str(user_id))
+        await self._np_file.save(copy.deepcopy(self.np_users))
+
+    async def revoke_np(self, user_id):
+        """Removes a user's no-prefix access. Returns False if they didn't have any."""
+        if self.np_users.pop(str(user_id), None) is None:
+            return False
+        self._unindex_np_user(int(user_id))
+        await self._np_file.save(copy.deepcopy(self.np_users))
+        return True
+
+    async def _expiry_loop(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                timeout = None
+                if self._expiry_heap:
+                    timeout = (self._expiry_heap[0][0] - datetime.datetime.now()).total_seconds()
+                    # Wake up at least hourly so a wall clock change can't push expiries back too far.
+                    timeout = min(max(timeout, 0), 3600)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                await self._expire_due()
+            except Exception as e:
+                print(f"Failed to expire no-prefix grants: {e}")
+                # Don't spin if the same entry keeps failing
+                await asyncio.sleep(self.check_interval)
+
+    async def _expire_due(self):
+        now = datetime.datetime.now()
+        expired = False
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expiry, user_id = heapq.heappop(self._expiry_heap)
+            # Entries for grants that were revoked or replaced since are just skipped.
+            if self._np_expiry.get(user_id) != expiry or user_id not in self._np_active:
+                continue
+            self.np_users[str(user_id)]["active"] = False
+            self._np_active.discard(user_id)
+            self._np_inactive.add(user_id)
+            expired = True
+        if expired:
+            await self._np_file.save(copy.deepcopy(self.np_users))
+
+    def _load_prefixes(self):
+        self.prefixes = self._read(self._prefix_file) or {}
+        self._guild_prefixes = {int(guild_id): (prefix,) for guild_id, prefix in self.prefixes.items()}
+
+    def _load_np_users(self):
+        np_users = self._read(self._np_file)
+        self.np_file_ok = np_users is not None
+        self.np_users = np_users or {}
+        self._np_active = set()
+        self._np_inactive = set()
+        self._np_expiry = {}
+        self._expiry_heap = []
+        for user_id in self.np_users:
+            self._index_np_user(user_id)
+
+    def _index_np_user(self, user_id):
+        data = self.np_users[user_id]
+        user_id = int(user_id)
+        self._unindex_np_user(user_id)
+        expires_at = data.get("expires_at", "lifetime")
+        if expires_at != "lifetime":
+            try:
+                self._np_expiry[user_id] = parse_expiry(expires_at)
+            except (ValueError, TypeError):
+                # Unreadable expiry dates fall back to the normal prefix.
+                self._np_inactive.add(user_id)
+                return
+        if not data.get("active", False):
+            self._np_inactive.add(user_id)
+            return
+        self._np_active.add(user_id)
+        if user_id in self._np_expiry:
+            heapq.heappush(self._expiry_heap, (self._np_expiry[user_id], user_id))
+            self._wakeup.set()
+
+    def _unindex_np_user(self, user_id):
+        # Its heap entry stays behind and is skipped once it comes up.
+        self._np_active.discard(user_id)
+        self._np_inactive.discard(user_id)
+        self._np_expiry.pop(user_id, None)
+
+    def _maybe_reload(self):
+        if self._prefix_file.changed():
+            self._load_prefixes()
+        if self._np_file.changed():
+            self._load_np_users()
+
+    @staticmethod
+    def _read(file):
+        try:
+            return file.read()
+        except ValueError:
+            return None
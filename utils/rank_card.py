@@ -0,0 +1,165 @@
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
+
+WIDTH, HEIGHT = 900, 250
+AVATAR_SIZE = 180
+AVATAR_POS = (35, 35)
+BAR_X, BAR_Y = 240, 170
+BAR_WIDTH, BAR_HEIGHT = 610, 40
+
+
+class RendererBusy(Exception):
+    """Raised when too many rank cards are already waiting to be rendered."""
+
+
+class CardTemplate:
+    """The parts of a rank card that are the same for everyone, built once per process.
+
+    Holds the fonts, the darkening overlay, the circular avatar mask and the
+    static chrome (progress bar track, "LEVEL" label, watermark and, for
+    cards with an avatar, the ring around it), so drawing a card only has to
+    add the avatar, the progress fill and the user's numbers.
+    """
+
+    def __init__(self):
+        # Fonts - Attempt to use a common font, fallback to default
+        try:
+            self.font_medium = ImageFont.truetype("arial.ttf", 50)
+            self.font_small = ImageFont.truetype("arial.ttf", 40)
+            self.font_level = ImageFont.truetype("arial.ttf", 80)
+            self.font_watermark = ImageFont.truetype("arial.ttf", 20)
+        except IOError:
+            self.font_medium = ImageFont.load_default()
+            self.font_small = ImageFont.load_default()
+            self.font_level = ImageFont.load_default()
+            self.font_watermark = ImageFont.load_default()
+
+        # Overlay to darken the background for better text readability
+        self.overlay = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 150))
+        self.plain_background = Image.new("RGBA", (WIDTH, HEIGHT), "#2C2F33")
+        self.plain_background.alpha_composite(self.overlay)
+
+        self.mask = Image.new('L', (AVATAR_SIZE, AVATAR_SIZE), 0)
+        ImageDraw.Draw(self.mask).ellipse((0, 0, AVATAR_SIZE, AVATAR_SIZE), fill=255)
+
+        self.chrome = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(self.chrome)
+        # Progress bar background
+        draw.rounded_rectangle((BAR_X, BAR_Y, BAR_X + BAR_WIDTH, BAR_Y + BAR_HEIGHT), radius=20, fill="#484b4e")
+        draw.text((240, 110), "LEVEL", fill="#AAAAAA", font=self.font_small)
+        # Watermark
+        watermark_text = ".gg/code-verse"
+        watermark_width = draw.textlength(watermark_text, font=self.font_watermark)
+        draw.text((WIDTH - watermark_width - 20, HEIGHT - 40), watermark_text, fill="#FFFFFF", font=self.font_watermark)
+
+        self.chrome_with_ring = self.chrome.copy()
+        x, y = AVATAR_POS
+        ImageDraw.Draw(self.chrome_with_ring).ellipse(
+            (x - 5, y - 5, x + AVATAR_SIZE + 5, y + AVATAR_SIZE + 5), outline="#7289DA", width=5
+        )
+
+
+_template = None
+
+
+def get_template():
+    global _template
+    if _template is None:
+        _template = CardTemplate()
+    return _template
+
+
+def render_rank_card(avatar_bytes, name, level, xp, xp_needed):
+    """Draws a rank card and returns it as PNG bytes.
+
+    Takes only plain data so it can run in a worker process. `avatar_bytes`
+    may be None, in which case the card gets a plain background.
+    """
+    template = get_template()
+
+    if avatar_bytes:
+        avatar = Image.open(io.BytesIO(avatar_bytes)).convert("RGBA")
+        # Blurred avatar as the background, with the round avatar on top
+        card = avatar.resize((WIDTH, HEIGHT)).filter(ImageFilter.GaussianBlur(5))
+        card.alpha_composite(template.overlay)
+        output = ImageOps.fit(avatar, (AVATAR_SIZE, AVATAR_SIZE), centering=(0.5, 0.5))
+        output.putalpha(template.mask)
+        card.alpha_composite(output, AVATAR_POS)
+        card.alpha_composite(template.chrome_with_ring)
+    else:
+        card = template.plain_background.copy()
+        card.alpha_composite(template.chrome)
+
+    draw = ImageDraw.Draw(card)
+
+    # Draw progress bar
+    if xp_needed > 0:
+        progress = min(xp / xp_needed, 1) * BAR_WIDTH
+        draw.rounded_rectangle((BAR_X, BAR_Y, BAR_X + progress, BAR_Y + BAR_HEIGHT), radius=20, fill="#57F287")
+
+    # Draw text
+    draw.text((240, 50), name, fill="#FFFFFF", font=template.font_medium)
+
+    xp_text = f"{xp} / {xp_needed} XP"
+    xp_text_width = draw.textlength(xp_text, font=template.font_small)
+    draw.text((840 - xp_text_width, 120), xp_text, fill="#BBBBBB", font=template.font_small)
+
+    level_number_text = f"{level}"
+    level_number_width = draw.textlength(level_number_text, font=template.font_level)
+    draw.text((840 - level_number_width, 45), level_number_text, fill="#FEE75C", font=template.font_level)
+
+    with io.BytesIO() as image_binary:
+        card.save(image_binary, 'PNG')
+        return image_binary.getvalue()
+
+
+def _warm_up():
+    return True
+
+
+class RankCardRenderer:
+    """Renders rank cards in a pool of worker processes.
+
+    Pillow work never runs on the event loop. At most `max_queue` cards can
+    be waiting or rendering at once; past that `render` raises RendererBusy
+    instead of letting the backlog grow.
+    """
+
+    def __init__(self, workers=2, max_queue=32):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._in_flight = 0
+
+    def start(self):
+        """Starts the worker processes.
+
+        Call this before anything else starts threads: on platforms that fork,
+        all workers are forked right here.
+        """
+        context = None
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        # Each worker draws its template as soon as it starts
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=get_template)
+        self._executor.submit(_warm_up)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def render(self, avatar_bytes, name, level, xp, xp_needed):
+        """Returns the PNG bytes of a rank card."""
+        if self._in_flight >= self.max_queue:
+            raise RendererBusy()
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, render_rank_card, avatar_bytes, name, level, xp, xp_needed)
+        finally:
+            self._in_flight -= 1
@@ -0,0 +1,55 @@
+import copy
+
+from .inventory import from_list
+
+# Bump this and append to MIGRATIONS whenever the account layout changes.
+SCHEMA_VERSION = 2
+
+DEFAULT_ACCOUNT = {
+    "wallet": 100,
+    "bank": 0,
+    "level": 1,
+    "xp": 0,
+    "inventory": {},
+    "daily_streak": 0,
+    "last_daily": None,
+    "pet": None,
+    "job": None,
+}
+
+
+def new_account():
+    """Returns a fresh account with every field at its default."""
+    account = copy.deepcopy(DEFAULT_ACCOUNT)
+    account["version"] = SCHEMA_VERSION
+    return account
+
+
+def _add_missing_fields(account):
+    for key, value in DEFAULT_ACCOUNT.items():
+        if key not in account:
+            account[key] = copy.deepcopy(value)
+
+
+def _inventory_to_counts(account):
+    if isinstance(account["inventory"], list):
+        account["inventory"] = from_list(account["inventory"])
+
+
+# (version, migration) pairs; each migration upgrades an account from version - 1 to version.
+MIGRATIONS = [
+    (1, _add_missing_fields),
+    (2, _inventory_to_counts),
+]
+
+
+def migrate(account):
+    """Upgrades an account in place to SCHEMA_VERSION. Returns True if anything changed."""
+    version = account.get("version", 0)
+    if version >= SCHEMA_VERSION:
+        return False
+    for target, migration in MIGRATIONS:
+        if target > version:
+            migration(account)
+    account["version"] = SCHEMA_VERSION
+    return True
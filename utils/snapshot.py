@@ -0,0 +1,79 @@
+import asyncio
+import os
+import tempfile
+
+from . import codec
+
+
+class SnapshotWriter:
+    """Writes JSON files atomically from a worker thread.
+
+    Saves for the same path are coalesced: while one write is running, any
+    further saves only replace the data waiting to go out next, so a burst of
+    saves ends up as at most two writes. Each file is written to a temporary
+    file in the same directory, fsynced, and renamed over the original, so
+    readers never see a half-written file.
+
+    Callers must not mutate `data` after handing it over; pass a copy if the
+    original stays live.
+    """
+
+    def __init__(self, compact=True):
+        self.compact = compact
+        self._pending = {}
+        self._writers = {}
+
+    async def save(self, path, data, compact=None):
+        """Schedules `data` to be written to `path` and waits until it is on disk.
+
+        `compact` overrides the writer's default encoding for this file.
+        """
+        if compact is None:
+            compact = self.compact
+        entry = self._pending.get(path)
+        if entry is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[path] = entry = [data, compact, future]
+            if path not in self._writers:
+                self._writers[path] = asyncio.create_task(self._drain(path))
+        else:
+            entry[0], entry[1] = data, compact
+        await asyncio.shield(entry[2])
+
+    async def drain(self):
+        """Waits for every scheduled write to finish."""
+        while self._writers:
+            await asyncio.gather(*self._writers.values(), return_exceptions=True)
+
+    async def _drain(self, path):
+        try:
+            while path in self._pending:
+                data, compact, future = self._pending.pop(path)
+                try:
+                    await asyncio.to_thread(write_atomic, path, data, compact)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(None)
+        finally:
+            del self._writers[path]
+
+
+def write_atomic(path, data, compact=True):
+    """Serializes `data` to `path` through a temp file, fsync and rename."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(codec.dumps(data, compact))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+snapshots = SnapshotWriter()
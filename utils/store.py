@@ -0,0 +1,310 @@
+import asyncio
+import contextlib
+import copy
+import weakref
+from collections import OrderedDict
+
+from . import schema
+
+
+class UserStore:
+    """Keeps user accounts in memory and writes changes back to disk in the background.
+
+    Cogs change accounts inside `transaction`, which locks the accounts
+    involved and marks them dirty if they changed. Dirty accounts are flushed every `flush_interval`
+    seconds, or sooner once `flush_threshold` accounts are waiting. Where the
+    accounts actually live is up to `backend` (see utils/backends.py).
+
+    With a `journal`, every change is also appended to an append-only log
+    right away, and each flush compacts that log into a new snapshot.
+
+    With `max_hot_users` set and a backend that can read single accounts
+    (`lazy = True`), only the most recently used accounts stay in memory.
+    Clean, unlocked accounts past the limit are evicted oldest first and read
+    back from the backend on their next access. The single-file JSON backend
+    always keeps every account hot.
+    """
+
+    def __init__(self, backend, flush_interval=10.0, flush_threshold=50, journal=None, max_hot_users=0):
+        self.backend = backend
+        self.journal = journal
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.max_hot_users = max_hot_users if getattr(backend, "lazy", False) else 0
+        if max_hot_users and not self.max_hot_users:
+            print("The selected storage backend can't load single accounts; keeping every account in memory.")
+        self.users = OrderedDict()
+        self.dirty = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._flushing = set()
+        self._loading = {}
+        # Cleared while update_all rewrites cold accounts in the backend
+        self._cold_ready = asyncio.Event()
+        self._cold_ready.set()
+        self._cold_reads = 0
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._locks = weakref.WeakValueDictionary()
+
+    async def start(self):
+        """Loads the accounts, upgrades them to the current schema and starts the flush loop."""
+        self.users = OrderedDict(await self.backend.load())
+        if self.journal is not None:
+            replayed = self.journal.replay(self.users)
+            if replayed:
+                print(f"Replayed journal changes for {len(replayed)} accounts.")
+            self.dirty |= replayed
+            self.journal.open()
+        migrated = {user_id for user_id, account in self.users.items() if schema.migrate(account)}
+        if migrated:
+            print(f"Migrated {len(migrated)} accounts to schema version {schema.SCHEMA_VERSION}.")
+            self.dirty |= migrated
+        await self.flush()
+        self._evict()
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stops the flush loop and writes out anything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        await self.backend.close()
+        if self.journal is not None:
+            self.journal.close()
+
+    async def get(self, user_id):
+        """Returns the live account dict for a user, or None if they have no account."""
+        user_id = str(user_id)
+        account = self.users.get(user_id)
+        if account is not None:
+            self.hits += 1
+            if self.max_hot_users:
+                self.users.move_to_end(user_id)
+            return account
+        if not self.max_hot_users:
+            return None
+        self.misses += 1
+        # Share one backend read between everyone asking for the same cold account,
+        # so they all end up holding the same dict.
+        task = self._loading.get(user_id)
+        if task is None:
+            task = self._loading[user_id] = asyncio.ensure_future(self._load_cold(user_id))
+            task.add_done_callback(lambda _: self._loading.pop(user_id, None))
+        return await asyncio.shield(task)
+
+    async def _load_cold(self, user_id):
+        await self._cold_ready.wait()
+        self._cold_reads += 1
+        try:
+            account = await self.backend.load_one(user_id)
+        finally:
+            self._cold_reads -= 1
+        if account is None:
+            return None
+        if user_id in self.users:
+            # Created while the read was in flight; the in-memory one is newer.
+            return self.users[user_id]
+        self.users[user_id] = account
+        if schema.migrate(account):
+            self.mark_dirty(user_id, op="migrate")
+        self._evict()
+        return account
+
+    async def ensure_account(self, user_id):
+        """Returns a user's account, opening a new one first if they don't have one yet."""
+        account = await self.get(user_id)
+        if account is not None:
+            return account
+        # Looking up a cold account awaits, so check again under the lock before creating one
+        async with self._lock_for(str(user_id)):
+            account = await self.get(user_id)
+            if account is None:
+                account = schema.new_account()
+                self.create(user_id, account)
+        return account
+
+    @contextlib.asynccontextmanager
+    async def transaction(self, *user_ids, op="update"):
+        """Locks the given accounts and yields them as a tuple, in the order given.
+
+        Locks are always taken in sorted id order, so two transactions over the
+        same users can never deadlock. Accounts that changed are marked dirty
+        when the block exits; if it raises, they are restored instead. Users
+        without an account are yielded as None. Transactions are not reentrant,
+        so don't open one for a user whose account you are already holding.
+        """
+        user_ids = [str(user_id) for user_id in user_ids]
+        async with contextlib.AsyncExitStack() as stack:
+            for user_id in sorted(set(user_ids)):
+                await stack.enter_async_context(self._lock_for(user_id))
+            accounts = {user_id: await self.get(user_id) for user_id in set(user_ids)}
+            before = {user_id: copy.deepcopy(account) for user_id, account in accounts.items() if account is not None}
+            try:
+                yield tuple(accounts[user_id] for user_id in user_ids)
+            except BaseException:
+                for user_id, original in before.items():
+                    accounts[user_id].clear()
+                    accounts[user_id].update(original)
+                raise
+            for user_id, original in before.items():
+                if accounts[user_id] != original:
+                    self.mark_dirty(user_id, op=op)
+
+    async def update_all(self, fn, op="update"):
+        """Applies `fn(account)` to every account, e.g. for daily interest.
+
+        Unlike a transaction per user, this never pulls cold accounts into
+        memory: hot accounts are changed in place, and the backend rewrites
+        the cold ones in bulk while flushes and cold reads wait. Accounts that
+        are locked by a transaction at that moment are done afterwards in
+        transactions of their own. `fn` must not await; whatever it returns
+        other than None is collected into the returned {user_id: result} dict.
+        """
+        results = {}
+        done = set()
+        busy = []
+
+        def apply(user_id, account):
+            before = copy.deepcopy(account)
+            try:
+                result = fn(account)
+            except BaseException:
+                account.clear()
+                account.update(before)
+                raise
+            if result is not None:
+                results[user_id] = result
+            return account != before
+
+        async with self._flush_lock:
+            self._cold_ready.clear()
+            try:
+                # Let reads that already got past the gate land in the hot tier first
+                while self._cold_reads:
+                    await asyncio.sleep(0.01)
+                # Nothing awaits in this loop, so no transaction can start on these accounts meanwhile.
+                for user_id, account in self.users.items():
+                    lock = self._locks.get(user_id)
+                    if lock is not None and lock.locked():
+                        busy.append(user_id)
+                        continue
+                    done.add(user_id)
+                    if apply(user_id, account):
+                        self.mark_dirty(user_id, op=op)
+                if self.max_hot_users:
+                    def migrated(account):
+                        schema.migrate(account)
+                        return fn(account)
+                    results.update(await self.backend.update_all(migrated, skip=done | set(busy) | self.users.keys()))
+            finally:
+                self._cold_ready.set()
+
+        for user_id in busy:
+            async with self.transaction(user_id, op=op) as (account,):
+                if account is not None:
+                    apply(user_id, account)
+        return results
+
+    def _lock_for(self, user_id):
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = self._locks[user_id] = asyncio.Lock()
+        return lock
+
+    async def all(self):
+        """Returns a mapping of every user id to its account.
+
+        With a hot/cold split this reads the cold accounts from the backend
+        without caching them, so treat the result as read-only.
+        """
+        if not self.max_hot_users:
+            return self.users
+        users = await self.backend.load_all()
+        users.update(self.users)
+        return users
+
+    def stats(self):
+        """Returns the cache counters, e.g. for a debug command."""
+        lookups = self.hits + self.misses
+        return {
+            "hot": len(self.users),
+            "max_hot": self.max_hot_users,
+            "dirty": len(self.dirty),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 1.0,
+        }
+
+    def _evict(self):
+        """Drops the least recently used clean accounts until the hot tier fits its limit."""
+        if not self.max_hot_users or len(self.users) <= self.max_hot_users:
+            return
+        for user_id in list(self.users):
+            if len(self.users) <= self.max_hot_users:
+                break
+            if user_id in self.dirty or user_id in self._flushing:
+                continue
+            lock = self._locks.get(user_id)
+            if lock is not None and lock.locked():
+                continue
+            del self.users[user_id]
+            self.evictions += 1
+
+    def create(self, user_id, account):
+        """Adds a new account and schedules it to be saved."""
+        self.users[str(user_id)] = account
+        self.mark_dirty(user_id, op="open_account")
+        self._evict()
+
+    def mark_dirty(self, user_id, op="update"):
+        """Flags an account as changed so the next flush writes it out.
+
+        `op` names the operation in the journal, e.g. "give" or "rob".
+        """
+        user_id = str(user_id)
+        if self.journal is not None:
+            self.journal.append(op, user_id, self.users[user_id])
+        self.dirty.add(user_id)
+        if len(self.dirty) >= self.flush_threshold:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Writes the current accounts to disk if anything has changed."""
+        async with self._flush_lock:
+            if not self.dirty:
+                return
+            flushed, self.dirty = self.dirty, set()
+            self._flushing = flushed
+            if self.journal is not None:
+                self.journal.rotate()
+            try:
+                await self.backend.save(self.users, flushed)
+            except Exception:
+                self.dirty |= flushed
+                raise
+            finally:
+                self._flushing = set()
+            if self.journal is not None:
+                self.journal.discard_rotated()
+        self._evict()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Failed to flush user data: {e}")
@@ -0,0 +1,73 @@
+import os
+
+from discord.ext import commands
+
+from . import codec
+
+
+class TosNotAccepted(commands.CheckFailure):
+    """Raised by the ToS check while a user still has to accept the terms."""
+
+
+class TosIndex:
+    """Users who have accepted the current version of the Terms of Service.
+
+    Acceptances live in an append-only log, one `{"id": ..., "v": ...}` line
+    each, and are held in memory as a set so checking a user is O(1). Only
+    acceptances of `version` count, so bumping `tos_version` in config.json
+    makes everyone accept again; the outdated lines are dropped the next time
+    the log is loaded.
+    """
+
+    def __init__(self, path="data/accepted_tos.log", version=1, legacy_path="data/accepted_tos.json"):
+        self.path = path
+        self.version = version
+        self.legacy_path = legacy_path
+        self.accepted = set()
+        self._file = None
+
+    def load(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        records = 0
+        if os.path.exists(self.path):
+            for record in codec.read_records(self.path):
+                records += 1
+                if record is not None and record.get("v") == self.version:
+                    self.accepted.add(record["id"])
+        elif self.legacy_path and os.path.exists(self.legacy_path):
+            # The old file was a plain list of ids accepted before versioning existed.
+            if self.version == 1:
+                self.accepted = set(codec.read(self.legacy_path))
+            print(f"Migrating {len(self.accepted)} ToS acceptances from {self.legacy_path} to {self.path}.")
+            records = -1
+        if records != len(self.accepted):
+            # Drop outdated, duplicate and broken lines.
+            self._rewrite()
+        self._file = open(self.path, 'ab')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __contains__(self, user_id):
+        return user_id in self.accepted
+
+    def add(self, user_id):
+        """Records that a user accepted the current version."""
+        if user_id in self.accepted:
+            return
+        self.accepted.add(user_id)
+        self._file.write(self._line(user_id))
+        self._file.flush()
+
+    def _line(self, user_id):
+        return codec.dumps({"id": user_id, "v": self.version}) + b"\n"
+
+    def _rewrite(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(b"".join(self._line(user_id) for user_id in sorted(self.accepted)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
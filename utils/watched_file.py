@@ -0,0 +1,56 @@
+import os
+import time
+
+from . import codec
+from .snapshot import snapshots
+
+
+class WatchedFile:
+    """A JSON file we keep in memory and save ourselves, but that may also be edited by hand.
+
+    `changed()` polls the file's mtime (at most every `check_interval`
+    seconds) and says whether it should be reloaded. Saves go through `save`,
+    which records the mtime of our own write so it doesn't count as an
+    outside edit. While any save is still on its way to disk, `changed()`
+    always says no: the file may hold an older write of ours than memory
+    does, and reloading it would roll memory back.
+    """
+
+    def __init__(self, path, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._mtime = None
+        self._next_check = 0.0
+        self._saves = 0
+
+    def read(self):
+        """Returns the decoded file, or None if it doesn't exist. Raises ValueError if it isn't valid JSON."""
+        self._mtime = self._file_mtime()
+        self._next_check = time.monotonic() + self.check_interval
+        if self._mtime is None:
+            return None
+        return codec.read(self.path)
+
+    def changed(self):
+        if self._saves:
+            return False
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.check_interval
+        return self._file_mtime() != self._mtime
+
+    async def save(self, data):
+        """Writes `data` atomically; see `snapshots.save`."""
+        self._saves += 1
+        try:
+            await snapshots.save(self.path, data)
+            self._mtime = self._file_mtime()
+        finally:
+            self._saves -= 1
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
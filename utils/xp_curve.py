@@ -0,0 +1,78 @@
+from bisect import bisect_right
+
+from . import codec
+from .snapshot import snapshots
+
+FIRST_LEVEL = 1 # new accounts start here, with 0 XP
+
+DEFAULT_CURVE = {"a": 5, "b": 50, "c": 100}
+
+
+class XpCurve:
+    """How much XP each level takes: a * level² + b * level + c to go from `level` to the next.
+
+    Accounts store their level and the XP earned inside that level. The curve
+    keeps a table of the total XP at which every level starts, so turning a
+    total back into a level is a bisect instead of a loop. The table grows on
+    its own if someone gets past `precompute` levels.
+    """
+
+    def __init__(self, a=5, b=50, c=100, precompute=1000):
+        self.a = a
+        self.b = b
+        self.c = c
+        # _starts[i] is the total XP at which level FIRST_LEVEL + i begins
+        self._starts = [0]
+        self._extend(FIRST_LEVEL + precompute)
+
+    @classmethod
+    def from_config(cls, options):
+        options = {**DEFAULT_CURVE, **(options or {})}
+        return cls(options["a"], options["b"], options["c"])
+
+    def to_config(self):
+        return {"a": self.a, "b": self.b, "c": self.c}
+
+    def __eq__(self, other):
+        return isinstance(other, XpCurve) and self.to_config() == other.to_config()
+
+    def xp_needed(self, level):
+        """XP needed to go from `level` to the next one."""
+        return self.a * (level ** 2) + (self.b * level) + self.c
+
+    def _extend(self, level):
+        while FIRST_LEVEL + len(self._starts) <= level:
+            last = FIRST_LEVEL + len(self._starts) - 1
+            self._starts.append(self._starts[-1] + max(self.xp_needed(last), 1))
+
+    def total_xp(self, level, xp):
+        """Total XP of someone `xp` into `level`."""
+        level = max(level, FIRST_LEVEL)
+        self._extend(level)
+        return self._starts[level - FIRST_LEVEL] + xp
+
+    def level_from_total_xp(self, total):
+        """Returns (level, xp into that level) for a total amount of XP."""
+        total = max(total, 0)
+        while self._starts[-1] <= total:
+            self._extend(FIRST_LEVEL + len(self._starts) * 2)
+        index = bisect_right(self._starts, total) - 1
+        return FIRST_LEVEL + index, total - self._starts[index]
+
+    def normalize(self, level, xp):
+        """Returns the (level, xp) an account should have, carrying XP over as many levels as it covers."""
+        return self.level_from_total_xp(self.total_xp(level, xp))
+
+
+def load_applied(path="data/xp_curve.json"):
+    """Returns the curve the stored levels were last computed with."""
+    try:
+        return XpCurve.from_config(codec.read(path))
+    except (FileNotFoundError, ValueError):
+        # Levels were only ever computed with the original curve
+        return XpCurve.from_config(DEFAULT_CURVE)
+
+
+async def save_applied(curve, path="data/xp_curve.json"):
+    """Records `curve` as the one the stored levels follow. Flush the store first."""
+    await snapshots.save(path, curve.to_config(), compact=False)
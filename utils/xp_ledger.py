@@ -0,0 +1,87 @@
+import asyncio
+
+LEVEL_UP_REWARD = 100 # coins per level reached, times the level
+
+
+class XpLedger:
+    """The one place XP gets added to accounts, whatever earned it.
+
+    Chat, command completion and commands like `work` all call `submit`.
+    XP is held per user together with the last message that earned it, and
+    everything a user has pending is written in a single transaction, either
+    by the background flush every `flush_interval` seconds or straight away
+    when it would take them to the next level. Levels follow `bot.xp_curve`,
+    and a big enough grant can carry someone over several levels at once;
+    they get the reward for every level passed. Level-ups are announced
+    through the bot's `level_up` event with that message, the member, the
+    new level and the total coin reward.
+    """
+
+    def __init__(self, bot, flush_interval=5.0):
+        self.bot = bot
+        self.flush_interval = flush_interval
+        # user id -> [pending xp, last message that earned some]
+        self.pending = {}
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stops the flush loop and writes out whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def pending_xp(self, user_id):
+        entry = self.pending.get(str(user_id))
+        return entry[0] if entry else 0
+
+    async def submit(self, message, member, amount):
+        """Records XP a member earned with `message`.
+
+        Don't call this while holding the member's store transaction; a
+        level-up applies the XP in a transaction of its own.
+        """
+        user_id = str(member.id)
+        account = await self.bot.store.ensure_account(user_id)
+        entry = self.pending.setdefault(user_id, [0, message])
+        entry[0] += amount
+        entry[1] = message
+        if account["xp"] + entry[0] >= self.bot.xp_curve.xp_needed(account["level"]):
+            await self.apply(user_id, member)
+
+    async def apply(self, user_id, member=None):
+        """Writes a user's pending XP now and announces a level-up if it causes one."""
+        async with self.bot.store.transaction(user_id, op="xp") as (account,):
+            # Popped under the lock so the same XP is never applied twice
+            xp, message = self.pending.pop(user_id, (0, None))
+            if account is None:
+                return
+            old_level = account["level"]
+            new_level, account["xp"] = self.bot.xp_curve.normalize(old_level, account["xp"] + xp)
+            leveled_up = new_level > old_level
+            if leveled_up:
+                account["level"] = new_level
+                reward = sum(LEVEL_UP_REWARD * level for level in range(old_level + 1, new_level + 1))
+                account["wallet"] += reward
+
+        if leveled_up and message is not None:
+            self.bot.dispatch("level_up", message, member or message.author, new_level, reward)
+
+    async def flush(self):
+        for user_id in list(self.pending):
+            await self.apply(user_id)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Failed to apply pending XP: {e}")